@@ -101,6 +101,34 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'DEFAULT_FILTER_BACKENDS': ['core.filters.FieldFilterBackend'],
+}
+
+if os.getenv("DJANGO_CACHE_DIR"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv("DJANGO_CACHE_DIR"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "300"))
+
+# Segundos que /api/sync/ retrocede sobre `since` para no perder filas de
+# transacciones que confirman después de una sincronización
+SYNC_OVERLAP_SECONDS = int(os.getenv("SYNC_OVERLAP_SECONDS", "300"))
+
+# Unidades por 1 USD; las filas "tasa CUP"/"tasa MLC" de Production_costs tienen prioridad
+EXCHANGE_RATES = {
+    'CUP': os.getenv("EXCHANGE_RATE_CUP"),
+    'MLC': os.getenv("EXCHANGE_RATE_MLC"),
 }
 
 LANGUAGE_CODE = 'en-us'
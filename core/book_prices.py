@@ -0,0 +1,213 @@
+import threading
+from itertools import islice
+from django.db import transaction
+from .models import Book, Additive, Book_price
+from .pricing import (BASE_CURRENCY, COST_CURRENCY, COVER_RE, FIXED_COSTS, RATE_PREFIX, PricingError,
+                      get_pricing_tables, book_base_price, cover_variants, convert)
+from .conditional import bump_table_version
+
+PRICE_FORMATS = ('normal', 'grande')
+BASE_COVER = 'Normal'
+ALL_BOOKS = None
+
+_pending = threading.local()
+
+
+def _price_rows(books, costs, rates, covers, formats=PRICE_FORMATS):
+    rows = []
+    for book in books:
+        for printing_format in formats:
+            base = book_base_price(book.number_pages, book.color_pages, printing_format, costs, rates)
+            variants = [(BASE_COVER, base)]
+            variants += [(cover, base + price) for cover, price in covers.get(printing_format, {}).items()]
+            for cover, usd in variants:
+                for currency in rates:
+                    rows.append(Book_price(
+                        idBook_id=book.pk,
+                        printing_format=printing_format,
+                        cover=cover,
+                        currency=currency,
+                        price=round(convert(usd, rates, BASE_CURRENCY, currency), 2)
+                    ))
+    return rows
+
+
+def _valid_tables(formats=PRICE_FORMATS):
+    try:
+        costs, rates = get_pricing_tables()
+        for printing_format in formats:
+            book_base_price(1, 0, printing_format, costs, rates)
+    except PricingError:
+        return None, None
+    return costs, rates
+
+
+# Recalcula la tabla Book_price (libro x formato x carátula x moneda) para
+# `book_ids`, o para todo el catálogo si es None, en los formatos dados. Si
+# faltan costos o tasas los precios se eliminan en lugar de quedar
+# desactualizados.
+def refresh_book_prices(book_ids=ALL_BOOKS, formats=PRICE_FORMATS, batch_size=1000):
+    books = Book.objects.only('idBook', 'number_pages', 'color_pages').order_by('pk')
+    stale = Book_price.objects.filter(printing_format__in=formats)
+    if book_ids is not ALL_BOOKS:
+        book_ids = set(book_ids)
+        if not book_ids:
+            return 0
+        books = books.filter(pk__in=book_ids)
+        stale = stale.filter(idBook_id__in=book_ids)
+
+    costs, rates = _valid_tables(formats)
+    covers = cover_variants(Additive.objects.values_list('name', 'price'))
+
+    created = 0
+    with transaction.atomic():
+        stale.delete()
+        if rates is not None:
+            iterator = books.iterator(chunk_size=batch_size)
+            while True:
+                chunk = list(islice(iterator, batch_size))
+                if not chunk:
+                    break
+                rows = Book_price.objects.bulk_create(
+                    _price_rows(chunk, costs, rates, covers, formats), batch_size=batch_size
+                )
+                created += len(rows)
+        bump_table_version(Book_price._meta.db_table)
+    return created
+
+
+# Filas derivadas del precio base en USD (carátula "Normal") ya guardado:
+# `extra` se suma en USD y el resultado se convierte a `currencies`.
+def _rows_from_base(printing_format, cover, extra, currencies, rates):
+    base_prices = Book_price.objects.filter(
+        printing_format=printing_format, cover=BASE_COVER, currency=BASE_CURRENCY
+    ).values_list('idBook_id', 'price')
+    return [
+        Book_price(
+            idBook_id=book_id,
+            printing_format=printing_format,
+            cover=cover,
+            currency=currency,
+            price=round(convert(base + extra, rates, BASE_CURRENCY, currency), 2)
+        )
+        for book_id, base in base_prices.iterator(chunk_size=2000)
+        for currency in currencies
+    ]
+
+
+# Recalcula solo la variante (formato, carátula) de todos los libros, tras
+# crear, cambiar o eliminar el aditivo "Carátula X (formato)".
+def refresh_cover_prices(printing_format, cover, batch_size=1000):
+    _, rates = _valid_tables()
+    price = cover_variants(Additive.objects.values_list('name', 'price')).get(printing_format, {}).get(cover)
+    with transaction.atomic():
+        Book_price.objects.filter(printing_format=printing_format, cover=cover).delete()
+        rows = []
+        if rates is not None and price is not None:
+            rows = Book_price.objects.bulk_create(
+                _rows_from_base(printing_format, cover, price, rates, rates), batch_size=batch_size
+            )
+        bump_table_version(Book_price._meta.db_table)
+    return len(rows)
+
+
+# Recalcula los precios en `currency` a partir de los de USD, tras cambiar
+# la fila "tasa X" correspondiente.
+def refresh_currency_prices(currency, batch_size=1000):
+    _, rates = _valid_tables()
+    with transaction.atomic():
+        Book_price.objects.filter(currency=currency).delete()
+        created = 0
+        if rates is not None and currency in rates:
+            variants = Book_price.objects.filter(currency=BASE_CURRENCY).values_list('printing_format', 'cover', 'idBook_id', 'price')
+            rows = [
+                Book_price(idBook_id=book_id, printing_format=printing_format, cover=cover, currency=currency,
+                           price=round(convert(usd, rates, BASE_CURRENCY, currency), 2))
+                for printing_format, cover, book_id, usd in variants.iterator(chunk_size=2000)
+            ]
+            created = len(Book_price.objects.bulk_create(rows, batch_size=batch_size))
+        bump_table_version(Book_price._meta.db_table)
+    return created
+
+
+# Qué parte de la tabla depende de un aditivo: solo las carátulas con
+# formato en el nombre entran en Book_price.
+def additive_scope(name):
+    match = COVER_RE.match(name or '')
+    if not match:
+        return {}
+    return {'covers': {(match.group(2).lower(), match.group(1).strip().capitalize())}}
+
+
+# Qué parte de la tabla depende de un costo de producción: una tasa solo
+# afecta a su moneda (salvo la moneda de los costos, que cambia los precios
+# base), "ziplo" solo al formato normal y el resto de costos del cálculo a
+# ambos formatos. Los productos que no intervienen no afectan a nada.
+def production_cost_scope(product):
+    product = product or ''
+    if product.lower().startswith(RATE_PREFIX):
+        currency = product[len(RATE_PREFIX):].strip().upper()
+        if currency == COST_CURRENCY:
+            return {'formats': set(PRICE_FORMATS)}
+        return {'currencies': {currency}}
+    formats = {f for f in PRICE_FORMATS if product in FIXED_COSTS[f]}
+    if product in ('Imprimir una hoja en BN', 'Imprimir una hoja en color', 'Precio de una hoja',
+                   'pliego A3', 'multiplicador'):
+        formats = set(PRICE_FORMATS)
+    return {'formats': formats} if formats else {}
+
+
+def _empty_scope():
+    return {'books': set(), 'formats': set(), 'covers': set(), 'currencies': set()}
+
+
+def _refresh_scope(scope):
+    if scope is ALL_BOOKS:
+        refresh_book_prices()
+        return
+    formats = tuple(f for f in PRICE_FORMATS if f in scope['formats'])
+    remaining = tuple(f for f in PRICE_FORMATS if f not in formats)
+    if formats:
+        refresh_book_prices(formats=formats)
+    if scope['books'] and remaining:
+        refresh_book_prices(scope['books'], formats=remaining)
+    for printing_format, cover in scope['covers']:
+        if printing_format in remaining:
+            refresh_cover_prices(printing_format, cover)
+    if remaining:
+        for currency in scope['currencies']:
+            refresh_currency_prices(currency)
+
+
+def _flush_pending():
+    scope = _pending.scope
+    _pending.scope = _empty_scope()
+    _pending.hooks = None
+    _refresh_scope(scope)
+
+
+# Marca como pendiente una parte de la tabla: todo el catálogo con ALL_BOOKS,
+# o libros concretos más lo que devuelven additive_scope y
+# production_cost_scope. Dentro de una transacción se acumula y se recalcula
+# una sola vez al hacer commit.
+def mark_book_prices_dirty(book_ids=ALL_BOOKS, formats=(), covers=(), currencies=()):
+    if book_ids is ALL_BOOKS:
+        scope = ALL_BOOKS
+    else:
+        scope = {'books': set(book_ids), 'formats': set(formats), 'covers': set(covers),
+                 'currencies': set(currencies)}
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _refresh_scope(scope)
+        return
+
+    if getattr(_pending, 'hooks', None) is not connection.run_on_commit:
+        _pending.scope = _empty_scope()
+        transaction.on_commit(_flush_pending)
+        _pending.hooks = connection.run_on_commit
+    if scope is ALL_BOOKS or _pending.scope is ALL_BOOKS:
+        _pending.scope = ALL_BOOKS
+    else:
+        for key, values in scope.items():
+            _pending.scope[key].update(values)
@@ -0,0 +1,48 @@
+import hashlib
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+from .models import Table_version
+
+
+def get_table_versions(tables):
+    versions = dict(Table_version.objects.filter(table__in=tables).values_list('table', 'version'))
+    return [versions.get(table, 1) for table in tables]
+
+
+def bump_table_version(table):
+    updated = Table_version.objects.filter(table=table).update(version=F('version') + 1)
+    if not updated:
+        _, created = Table_version.objects.get_or_create(table=table, defaults={'version': 2})
+        if not created:
+            Table_version.objects.filter(table=table).update(version=F('version') + 1)
+
+
+# GET condicional para catálogos que cambian poco. El ETag (fuerte) depende de
+# la versión de cada tabla en `version_tables` y de la URL completa, así que
+# cualquier escritura en esas tablas lo invalida. Si coincide con
+# If-None-Match se responde 304 sin ejecutar la vista.
+class ConditionalGetMixin:
+    version_tables = ()
+
+    def _catalog_etag(self, request):
+        versions = get_table_versions(self.version_tables)
+        key = f"{request.get_full_path()}|" + "|".join(
+            f"{table}:{version}" for table, version in zip(self.version_tables, versions)
+        )
+        return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not self.version_tables:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = self._catalog_etag(request)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
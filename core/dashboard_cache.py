@@ -0,0 +1,51 @@
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'dashboard:version'
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_dashboard_cache():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def invalidate_dashboard_cache_on_commit():
+    transaction.on_commit(invalidate_dashboard_cache)
+
+
+# Guarda en caché las respuestas 200 de una acción del dashboard. La clave
+# incluye la versión global (se incrementa en cada escritura), el día actual
+# y los parámetros de la petición. Añade la cabecera X-Cache: HIT/MISS.
+def cached_dashboard_response(name):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            key = f"dashboard:{_current_version()}:{name}:{timezone.now().date()}:{request.GET.urlencode()}"
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+# Operadores que habilita cada tipo de filtro declarado en la vista
+LOOKUPS = {
+    'exact': ('exact',),
+    'in': ('in',),
+    'range': ('gte', 'lte', 'range'),
+}
+
+
+# Filtros declarativos por vista:
+#   filter_fields = {'idOrder': ('exact', 'in'), 'order_date': ('exact', 'range')}
+# ?idOrder=5, ?idOrder__in=1,2,3, ?order_date__gte=2025-01-01, ?order_date__range=a,b
+# Los parámetros que no están en la lista blanca se ignoran.
+class FieldFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        allowed = getattr(view, 'filter_fields', None)
+        if not allowed:
+            return queryset
+
+        filters = {}
+        errors = {}
+        for param, raw in request.query_params.items():
+            name, _, lookup = param.partition('__')
+            lookup = lookup or 'exact'
+            kinds = allowed.get(name, ())
+            if not any(lookup in LOOKUPS[kind] for kind in kinds):
+                continue
+            field = queryset.model._meta.get_field(name)
+            try:
+                if lookup in ('in', 'range'):
+                    values = [self._to_python(field, v) for v in raw.split(',') if v.strip()]
+                    if lookup == 'range' and len(values) != 2:
+                        raise DjangoValidationError('Se esperaban dos valores separados por coma.')
+                    filters[f'{name}__{lookup}'] = values
+                else:
+                    filters[f'{name}__{lookup}'] = self._to_python(field, raw)
+            except DjangoValidationError as e:
+                errors[param] = e.messages
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
+
+    @staticmethod
+    def _to_python(field, value):
+        target = field.target_field if field.is_relation else field
+        return target.to_python(value.strip())
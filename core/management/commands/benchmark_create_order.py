@@ -0,0 +1,75 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from core.models import Client, Delivery, Book, Additive
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide la latencia de create_full_order según la cantidad de libros (los datos se descartan al terminar)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, nargs='+', default=[1, 5, 10, 30, 60])
+        parser.add_argument('--additives', type=int, default=2, help="Aditivos por libro")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _run(self, options):
+        api = APIClient()
+        client = Client.objects.create(name="Benchmark", phone_number="0", identity="benchmark-create-order")
+        delivery = Delivery.objects.create(zone="Benchmark", price=0, description="")
+        additives = [
+            Additive.objects.create(name=f"Benchmark aditivo {i}", price=1)
+            for i in range(options['additives'])
+        ]
+        max_books = max(options['books'])
+        books = [
+            Book.objects.create(title=f"Benchmark {i}", author="Benchmark", number_pages=200,
+                                printing_format="normal", color_pages=0)
+            for i in range(max_books)
+        ]
+
+        self.stdout.write(f"{'libros':>8} {'consultas':>10} {'ms (media)':>12} {'ms (mín)':>10}")
+        for count in options['books']:
+            payload = {
+                "idClient": client.pk,
+                "idDelivery": delivery.pk,
+                "order_date": "2025-01-01",
+                "delivery_date": "2025-02-01",
+                "total_price": 0,
+                "pay_method": "Efectivo",
+                "done": False,
+                "payment_advance": 0,
+                "outstanding_payment": 0,
+                "requested_books": [
+                    {"idBook": book.pk, "additives": [a.pk for a in additives], "quantity": 1, "discount": 0, "base_price": 0}
+                    for book in books[:count]
+                ],
+            }
+            timings = []
+            queries = 0
+            for _ in range(options['repeat']):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = api.post("/api/orders/create_full_order/", payload, format="json")
+                    timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 201:
+                    self.stderr.write(f"Error con {count} libros: {response.content!r}")
+                    return
+                queries = len(ctx.captured_queries)
+
+            self.stdout.write(
+                f"{count:>8} {queries:>10} {sum(timings) / len(timings):>12.2f} {min(timings):>10.2f}"
+            )
@@ -0,0 +1,33 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from core.order_import import import_orders, orders_from_data, rows_from_csv
+
+
+class Command(BaseCommand):
+    help = "Importa órdenes con sus libros y aditivos desde un archivo CSV o JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json'], help="Por defecto se deduce de la extensión")
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"No existe el archivo {path}")
+
+        file_format = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'json')
+        text = path.read_text(encoding='utf-8-sig')
+        try:
+            rows = orders_from_data(rows_from_csv(text) if file_format == 'csv' else json.loads(text))
+        except ValueError as e:
+            raise CommandError(f"Archivo inválido: {e}")
+
+        report = import_orders(rows, chunk_size=options['chunk_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(report['created'])} órdenes importadas, {len(report['errors'])} con errores."
+        ))
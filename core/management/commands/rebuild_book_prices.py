@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.book_prices import refresh_book_prices
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero la tabla de precios por libro, formato, carátula y moneda"
+
+    def handle(self, *args, **options):
+        created = refresh_book_prices()
+        self.stdout.write(self.style.SUCCESS(f"{created} precios recalculados."))
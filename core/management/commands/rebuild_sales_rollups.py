@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from core.models import Daily_sales, Monthly_book_sales
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero las tablas de resumen de ventas del dashboard"
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"{Daily_sales.objects.count()} días y {Monthly_book_sales.objects.count()} filas libro/mes recalculadas."
+        ))
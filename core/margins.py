@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .models import Book_on_order, Order, Requested_book_additive, Production_costs_history
+from .pricing import COST_CURRENCY, COVER_RE, FIXED_COSTS, RATE_PREFIX
+
+# Valor que marca un costo eliminado en el historial (antes de ffill)
+_DELETED = -1.0
+BASE_COVER = 'Normal'
+GROUPS = ('month', 'format', 'cover', 'book')
+COST_PRODUCTS = (
+    'Imprimir una hoja en BN', 'Imprimir una hoja en color', 'Precio de una hoja', 'pliego A3',
+) + FIXED_COSTS['normal']
+
+
+class MarginAnalysisError(Exception):
+    pass
+
+
+def _frame(queryset, columns):
+    return pd.DataFrame.from_records(queryset.values_list(*columns).iterator(chunk_size=5000), columns=columns)
+
+
+# Tabla fecha -> costo vigente de cada producto, a partir del historial
+def _cost_timeline():
+    history = _frame(Production_costs_history.objects.order_by('changed_at', 'id'),
+                     ['changed_at', 'product', 'product_price'])
+    if history.empty:
+        raise MarginAnalysisError('No hay historial de costos de producción.')
+    history['day'] = pd.to_datetime(history['changed_at'], utc=True).dt.tz_localize(None).dt.normalize().astype('datetime64[ns]')
+    history['product_price'] = history['product_price'].astype('float64').fillna(_DELETED)
+    timeline = (
+        history.drop_duplicates(['day', 'product'], keep='last')
+        .pivot(index='day', columns='product', values='product_price')
+        .ffill()
+        .replace(_DELETED, np.nan)
+    )
+
+    rate_column = f'{RATE_PREFIX}{COST_CURRENCY}'
+    rate_columns = [c for c in timeline.columns if c.lower() == rate_column.lower()]
+    fallback = getattr(settings, 'EXCHANGE_RATES', {}).get(COST_CURRENCY)
+    rate = timeline[rate_columns[0]] if rate_columns else pd.Series(np.nan, index=timeline.index)
+    timeline['_rate'] = rate.fillna(float(fallback) if fallback else np.nan)
+
+    for product in COST_PRODUCTS:
+        if product not in timeline.columns:
+            timeline[product] = np.nan
+    return timeline[list(COST_PRODUCTS) + ['_rate']].reset_index()
+
+
+def _date_range(queryset, field, date_from, date_to):
+    if date_from:
+        queryset = queryset.filter(**{f'{field}__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{field}__lte': date_to})
+    return queryset
+
+
+# Lo cobrado por mes según las órdenes (total_price - discount), para
+# contrastarlo con el ingreso reconstruido a partir de las líneas.
+def _billed_by_month(date_from, date_to):
+    orders = _frame(_date_range(Order.objects.all(), 'order_date', date_from, date_to),
+                    ['order_date', 'total_price', 'discount'])
+    if orders.empty:
+        return pd.Series(dtype='float64')
+    orders['month'] = pd.to_datetime(orders['order_date']).dt.strftime('%Y-%m')
+    return (orders['total_price'] - orders['discount']).groupby(orders['month']).sum()
+
+
+def _line_items(date_from=None, date_to=None):
+    links = _date_range(Book_on_order.objects.all(), 'idOrder__order_date', date_from, date_to)
+    lines = _frame(links, [
+        'idRequested_book', 'idOrder', 'idOrder__order_date', 'quantity', 'discount', 'base_price',
+        'idRequested_book__idBook', 'idRequested_book__idBook__title', 'idRequested_book__idBook__number_pages',
+        'idRequested_book__idBook__color_pages', 'idRequested_book__idBook__printing_format',
+    ])
+    lines.columns = ['requested_book', 'order', 'day', 'quantity', 'discount', 'base_price',
+                     'book', 'title', 'pages', 'color_pages', 'format']
+
+    additives = _frame(
+        Requested_book_additive.objects.filter(idRequested_book__in=links.values('idRequested_book')),
+        ['idRequested_book', 'idAdditive__name', 'additive_price']
+    )
+    additives.columns = ['requested_book', 'name', 'price']
+    match = additives['name'].astype(str).str.extract(COVER_RE.pattern, flags=COVER_RE.flags)[0]
+    is_cover = additives['name'].astype(str).str.strip().str.lower().str.match(r'car[aá]tula')
+    additives['cover'] = match.fillna(additives['name'].astype(str).str.replace(r'\s*\(.*?\)', '', regex=True)).str.strip().str.capitalize()
+
+    covers = additives[is_cover].drop_duplicates('requested_book', keep='last').set_index('requested_book')
+    extras = additives[~is_cover].groupby('requested_book')['price'].sum()
+    lines['cover'] = lines['requested_book'].map(covers['cover']).fillna(BASE_COVER)
+    lines['cover_price'] = lines['requested_book'].map(covers['price']).fillna(0.0)
+    lines['extras_price'] = lines['requested_book'].map(extras).fillna(0.0)
+    return lines
+
+
+# Costo de producción en USD por ejemplar con los costos vigentes en la fecha
+# de cada orden; mismo cálculo que pricing.book_base_price sin el multiplicador.
+def _unit_costs(lines, timeline):
+    lines['day'] = pd.to_datetime(lines['day']).astype('datetime64[ns]')
+    lines = pd.merge_asof(lines.sort_values('day'), timeline, on='day', direction='backward')
+
+    pages = lines['pages'].to_numpy(dtype='float64')
+    color = lines['color_pages'].to_numpy(dtype='float64')
+    fmt = lines['format'].astype(str).str.strip().str.lower().to_numpy()
+    grande = fmt == 'grande'
+    known = grande | (fmt == 'normal')
+    cost = {product: lines[product].to_numpy(dtype='float64') for product in COST_PRODUCTS}
+
+    sheets = np.where(grande, 2.0, 4.0)
+    printing = (
+        (cost['Imprimir una hoja en BN'] + cost['Precio de una hoja']) * (pages / sheets) +
+        (cost['Imprimir una hoja en color'] + cost['Precio de una hoja']) * (color / sheets)
+    )
+    cover = np.where(grande | (pages > 500) | (color > 500), cost['pliego A3'], cost['pliego A3'] / 2)
+    fixed = sum(cost[name] for name in FIXED_COSTS['grande'])
+    fixed = fixed + np.where(grande, 0.0, cost['ziplo'])
+
+    unit_cost = (printing + cover + fixed) / lines['_rate'].to_numpy(dtype='float64')
+    lines['unit_cost'] = np.where(known, unit_cost, np.nan)
+    return lines
+
+
+def _summary(frame, by, billed=None):
+    grouped = frame.groupby(by, dropna=False).agg(
+        items=('quantity', 'sum'), revenue=('revenue', 'sum'), cost=('cost', 'sum')
+    ).reset_index()
+    if billed is not None:
+        grouped['billed'] = grouped[by[0]].map(billed).fillna(0.0).round(2)
+    grouped['margin'] = grouped['revenue'] - grouped['cost']
+    grouped['margin_pct'] = np.where(grouped['revenue'] > 0, grouped['margin'] / grouped['revenue'] * 100, np.nan)
+    grouped[['revenue', 'cost', 'margin', 'margin_pct']] = grouped[['revenue', 'cost', 'margin', 'margin_pct']].round(2)
+    return grouped.astype(object).where(grouped.notna(), None).to_dict('records')
+
+
+# Margen real por mes, formato, carátula y/o libro sobre todos los libros
+# pedidos. Ingreso por línea: (precio base + carátula) con descuento más los
+# demás aditivos, por cantidad. Costo: producción del libro con los costos
+# vigentes en la fecha de la orden. Las líneas sin costo calculable se
+# cuentan en `missing_costs` y no entran en los totales. Por mes se incluye
+# además `billed`, lo facturado en las órdenes.
+def margin_analysis(group_by=('month', 'format', 'cover'), date_from=None, date_to=None):
+    timeline = _cost_timeline()
+    lines = _line_items(date_from, date_to)
+    result = {'lines': len(lines), 'missing_costs': 0}
+    if lines.empty:
+        result.update({group: [] for group in group_by})
+        return result
+
+    lines = _unit_costs(lines, timeline)
+    lines['revenue'] = (
+        (lines['base_price'] + lines['cover_price']) * (1 - lines['discount'] / 100.0) + lines['extras_price']
+    ) * lines['quantity']
+    lines['cost'] = lines['unit_cost'] * lines['quantity']
+    lines['month'] = lines['day'].dt.strftime('%Y-%m')
+
+    missing = lines['cost'].isna()
+    result['missing_costs'] = int(missing.sum())
+    lines = lines[~missing]
+
+    columns = {'month': ['month'], 'format': ['format'], 'cover': ['cover'], 'book': ['book', 'title']}
+    for group in group_by:
+        billed = _billed_by_month(date_from, date_to) if group == 'month' else None
+        result[group] = _summary(lines, columns[group], billed)
+    return result
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_book_on_order_base_price_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='phone_number',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['idClient', '-idOrder'], name='order_client_recent_idx'),
+        ),
+    ]
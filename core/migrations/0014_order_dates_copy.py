@@ -0,0 +1,84 @@
+from datetime import datetime
+from django.db import migrations, models
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y')
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# Las fechas que no se pueden interpretar detienen la migración con la lista
+# de órdenes afectadas; inventar una fecha falsearía las ventas históricas.
+def copy_dates_forward(apps, schema_editor):
+    Order = apps.get_model('core', 'Order')
+    invalid = []
+    batch = []
+    for order in Order.objects.only('idOrder', 'order_date', 'delivery_date').iterator(chunk_size=2000):
+        order.order_date_new = parse_date(order.order_date)
+        order.delivery_date_new = parse_date(order.delivery_date)
+        if order.order_date_new is None or order.delivery_date_new is None:
+            invalid.append(f"{order.idOrder} ({order.order_date!r}, {order.delivery_date!r})")
+            continue
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, ['order_date_new', 'delivery_date_new'])
+            batch = []
+    if invalid:
+        raise RuntimeError(
+            f"Órdenes con fechas inválidas (use {', '.join(DATE_FORMATS)}); "
+            f"corríjalas y vuelva a migrar: {'; '.join(invalid)}"
+        )
+    if batch:
+        Order.objects.bulk_update(batch, ['order_date_new', 'delivery_date_new'])
+
+
+def copy_dates_backward(apps, schema_editor):
+    Order = apps.get_model('core', 'Order')
+    batch = []
+    for order in Order.objects.only('idOrder', 'order_date_new', 'delivery_date_new').iterator(chunk_size=2000):
+        order.order_date = order.order_date_new.strftime('%Y-%m-%d')
+        order.delivery_date = order.delivery_date_new.strftime('%Y-%m-%d')
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, ['order_date', 'delivery_date'])
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, ['order_date', 'delivery_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_order_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_date',
+            field=models.CharField(max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='delivery_date',
+            field=models.CharField(max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='order_date_new',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_date_new',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(copy_dates_forward, copy_dates_backward),
+    ]
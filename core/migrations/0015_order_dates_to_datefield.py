@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_order_dates_copy'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='order',
+            name='order_date',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='delivery_date',
+        ),
+        migrations.RenameField(
+            model_name='order',
+            old_name='order_date_new',
+            new_name='order_date',
+        ),
+        migrations.RenameField(
+            model_name='order',
+            old_name='delivery_date_new',
+            new_name='delivery_date',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='delivery_date',
+            field=models.DateField(db_index=True),
+        ),
+    ]
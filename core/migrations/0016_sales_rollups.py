@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_order_dates_to_datefield'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Daily_sales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('orders', models.IntegerField(default=0)),
+                ('revenue', models.FloatField(default=0)),
+                ('books', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Monthly_book_sales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('idBook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', '-quantity'], name='month_book_sales_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('month', 'idBook'), name='unique_month_book_sales')],
+            },
+        ),
+    ]
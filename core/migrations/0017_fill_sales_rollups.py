@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count, Sum, F
+from django.db.models.functions import TruncMonth
+
+
+def fill_rollups(apps, schema_editor):
+    Order = apps.get_model('core', 'Order')
+    Book_on_order = apps.get_model('core', 'Book_on_order')
+    Daily_sales = apps.get_model('core', 'Daily_sales')
+    Monthly_book_sales = apps.get_model('core', 'Monthly_book_sales')
+
+    book_totals = dict(
+        Book_on_order.objects.values('idOrder__order_date')
+        .annotate(books=Sum('quantity'))
+        .values_list('idOrder__order_date', 'books')
+    )
+    Daily_sales.objects.bulk_create([
+        Daily_sales(
+            day=row['order_date'],
+            orders=row['orders'],
+            revenue=round(row['revenue'] or 0, 2),
+            books=book_totals.get(row['order_date']) or 0
+        )
+        for row in Order.objects.values('order_date').annotate(orders=Count('idOrder'), revenue=Sum('total_price'))
+    ], batch_size=1000)
+
+    monthly_rows = (
+        Book_on_order.objects
+        .annotate(month=TruncMonth('idOrder__order_date'), book=F('idRequested_book__idBook'))
+        .values('month', 'book')
+        .annotate(total=Sum('quantity'))
+    )
+    Monthly_book_sales.objects.bulk_create([
+        Monthly_book_sales(month=row['month'], idBook_id=row['book'], quantity=row['total'] or 0)
+        for row in monthly_rows
+    ], batch_size=1000)
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model('core', 'Daily_sales').objects.all().delete()
+    apps.get_model('core', 'Monthly_book_sales').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rollups, clear_rollups),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_fill_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Table_version',
+            fields=[
+                ('table', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=1)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_sync_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book_on_order',
+            index=models.Index(fields=['idOrder', 'idRequested_book'], name='book_on_order_order_book_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['added_to_excel', 'done'], name='order_excel_done_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Book_price',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('printing_format', models.CharField(max_length=20)),
+                ('cover', models.CharField(max_length=100)),
+                ('currency', models.CharField(max_length=3)),
+                ('price', models.FloatField()),
+                ('idBook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.book')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('idBook', 'printing_format', 'cover', 'currency'), name='unique_book_price')],
+            },
+        ),
+    ]
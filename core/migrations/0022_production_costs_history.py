@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:34
+
+from datetime import datetime, timezone
+from django.db import migrations, models
+
+
+# Sin historial previo, los costos actuales se toman como vigentes desde siempre
+def seed_history(apps, schema_editor):
+    Production_costs = apps.get_model('core', 'Production_costs')
+    Production_costs_history = apps.get_model('core', 'Production_costs_history')
+    since = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    Production_costs_history.objects.bulk_create([
+        Production_costs_history(product=product, product_price=price, changed_at=since)
+        for product, price in Production_costs.objects.values_list('product', 'product_price')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_book_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Production_costs_history',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.CharField(max_length=100)),
+                ('product_price', models.FloatField(null=True)),
+                ('changed_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(seed_history, migrations.RunPython.noop),
+    ]
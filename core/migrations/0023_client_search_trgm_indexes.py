@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+# Los índices trigram solo existen en PostgreSQL; en otros motores (SQLite
+# en pruebas) se omiten igual que TrigramExtension.
+class PostgresAddIndex(migrations.AddIndex):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_production_costs_history'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AlterField(
+            model_name='client',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='phone_number',
+            field=models.CharField(max_length=50),
+        ),
+        PostgresAddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='client_name_trgm_idx'),
+        ),
+        PostgresAddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('identity'), name='gin_trgm_ops'), name='client_identity_trgm_idx'),
+        ),
+        PostgresAddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('phone_number'), name='gin_trgm_ops'), name='client_phone_trgm_idx'),
+        ),
+    ]
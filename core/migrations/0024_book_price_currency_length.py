@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_client_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book_price',
+            name='currency',
+            field=models.CharField(max_length=100),
+        ),
+    ]
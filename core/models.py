@@ -1,10 +1,23 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 
 class Client(models.Model):
     idClient = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
     phone_number = models.CharField(max_length=50)
     identity = models.CharField(max_length= 20, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # icontains compila a UPPER(col) LIKE UPPER('%q%'); solo un índice
+        # trigram sobre la misma expresión evita recorrer toda la tabla.
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='client_name_trgm_idx'),
+            GinIndex(OpClass(Upper('identity'), name='gin_trgm_ops'), name='client_identity_trgm_idx'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='client_phone_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -15,6 +28,8 @@ class Delivery(models.Model):
     zone = models.CharField(max_length=100)
     price = models.FloatField()
     description = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.zone
@@ -26,6 +41,8 @@ class Book(models.Model):
     number_pages = models.IntegerField()
     printing_format = models.CharField(max_length=100)
     color_pages = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
@@ -34,6 +51,8 @@ class Additive(models.Model):
     idAdditive = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
     price = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -41,6 +60,8 @@ class Additive(models.Model):
 class Requested_book(models.Model):
     idRequested_book = models.AutoField(primary_key=True)
     idBook = models.ForeignKey(Book, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.idBook.title
@@ -51,8 +72,8 @@ class Order(models.Model):
     address = models.TextField(null=True, blank=True)
     idDelivery = models.ForeignKey(Delivery, on_delete=models.PROTECT)
     idClient = models.ForeignKey(Client, on_delete=models.PROTECT)
-    order_date = models.CharField(max_length=10)
-    delivery_date = models.CharField(max_length=10)
+    order_date = models.DateField(db_index=True)
+    delivery_date = models.DateField(db_index=True)
     total_price = models.FloatField()
     pay_method = models.CharField(max_length= 100)
     done = models.BooleanField()
@@ -61,13 +82,23 @@ class Order(models.Model):
     Requested_book = models.ManyToManyField(Requested_book, through='Book_on_order')
     added_to_excel = models.BooleanField(default=False)
     discount = models.FloatField(default=0)
-    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            models.Index(fields=['idClient', '-idOrder'], name='order_client_recent_idx'),
+            models.Index(fields=['added_to_excel', 'done'], name='order_excel_done_idx'),
+        ]
+
+    def update_outstanding_payment(self):
         total_effective = self.total_price - self.discount
         self.outstanding_payment = round(total_effective - self.payment_advance, 2)
         if self.outstanding_payment < 0:
             self.outstanding_payment = 0
+
+    def save(self, *args, **kwargs):
+        self.update_outstanding_payment()
         super().save(*args, **kwargs)
 
 class Book_on_order(models.Model):
@@ -77,12 +108,21 @@ class Book_on_order(models.Model):
     ready = models.BooleanField()
     quantity = models.IntegerField()
     base_price = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['idOrder', 'idRequested_book'], name='book_on_order_order_book_idx'),
+        ]
 
 
 class Requested_book_additive(models.Model):
     idRequested_book = models.ForeignKey(Requested_book, on_delete=models.CASCADE)
     idAdditive = models.ForeignKey(Additive, on_delete=models.CASCADE)
     additive_price = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.idRequested_book.idBook.title} + {self.idAdditive.name}"
@@ -91,3 +131,57 @@ class Production_costs(models.Model):
     idProduction_costs = models.AutoField(primary_key=True)
     product = models.CharField(max_length=100)
     product_price = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+class Production_costs_history(models.Model):
+    product = models.CharField(max_length=100)
+    product_price = models.FloatField(null=True)
+    changed_at = models.DateTimeField(db_index=True)
+
+class Daily_sales(models.Model):
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    revenue = models.FloatField(default=0)
+    books = models.IntegerField(default=0)
+
+class Monthly_book_sales(models.Model):
+    month = models.DateField()
+    idBook = models.ForeignKey(Book, on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'idBook'], name='unique_month_book_sales'),
+        ]
+        indexes = [
+            models.Index(fields=['month', '-quantity'], name='month_book_sales_top_idx'),
+        ]
+
+class Book_price(models.Model):
+    idBook = models.ForeignKey(Book, on_delete=models.CASCADE)
+    printing_format = models.CharField(max_length=20)
+    cover = models.CharField(max_length=100)
+    # Cualquier fila "tasa X" de Production_costs define una moneda, así que
+    # cabe lo mismo que en Production_costs.product
+    currency = models.CharField(max_length=100)
+    price = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['idBook', 'printing_format', 'cover', 'currency'], name='unique_book_price'),
+        ]
+
+class Table_version(models.Model):
+    table = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=1)
+
+class Deleted_record(models.Model):
+    table = models.CharField(max_length=50)
+    record_id = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['table', 'deleted_at'], name='deleted_record_table_idx'),
+        ]
@@ -0,0 +1,77 @@
+from .models import Book, Additive, Requested_book, Book_on_order, Requested_book_additive
+from .rollups import mark_orders_dirty
+
+
+# Crea libros solicitados, aditivos y Book_on_order de varias órdenes ya
+# guardadas con una consulta por catálogo y un bulk_create por tabla.
+# `orders_books` es una lista de pares (order, requested_books) con el formato
+# que recibe create_full_order.
+def _to_id(value, label):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} inválido: {value!r}")
+
+
+# Normaliza los ids del payload (pueden llegar como "1") a enteros
+def _parse_requested_book(rb):
+    additives = rb.get("additives", [])
+    if not isinstance(additives, list):
+        raise ValueError(f"Se esperaba una lista de aditivos: {additives!r}")
+    return {
+        **rb,
+        "idBook": _to_id(rb.get("idBook"), "Libro"),
+        "additives": [_to_id(add_id, "Aditivo") for add_id in additives],
+    }
+
+
+def bulk_create_order_books(orders_books):
+    orders_books = [
+        (order, [_parse_requested_book(rb) for rb in requested_books])
+        for order, requested_books in orders_books
+    ]
+    book_ids = set()
+    additive_ids = set()
+    for _, requested_books in orders_books:
+        for rb in requested_books:
+            book_ids.add(rb["idBook"])
+            additive_ids.update(rb["additives"])
+
+    existing_books = set(Book.objects.filter(pk__in=book_ids).values_list('pk', flat=True))
+    missing_books = book_ids - existing_books
+    if missing_books:
+        raise ValueError(f"Libros no encontrados: {sorted(missing_books)}")
+
+    additives = Additive.objects.in_bulk(additive_ids)
+    missing_additives = additive_ids - set(additives)
+    if missing_additives:
+        raise ValueError(f"Aditivos no encontrados: {sorted(missing_additives)}")
+
+    flat = [(order, rb) for order, requested_books in orders_books for rb in requested_books]
+    requested_books = Requested_book.objects.bulk_create(
+        [Requested_book(idBook_id=rb["idBook"]) for _, rb in flat]
+    )
+
+    book_additives = []
+    book_links = []
+    for (order, rb), requested_book in zip(flat, requested_books):
+        for add_id in rb["additives"]:
+            additive = additives[add_id]
+            book_additives.append(Requested_book_additive(
+                idRequested_book=requested_book,
+                idAdditive=additive,
+                additive_price=additive.price
+            ))
+        book_links.append(Book_on_order(
+            idRequested_book=requested_book,
+            idOrder=order,
+            discount=rb.get("discount", 0),
+            ready=rb.get("ready", False),
+            quantity=rb.get("quantity", 1),
+            base_price=rb.get("base_price", 0)
+        ))
+
+    Requested_book_additive.objects.bulk_create(book_additives)
+    Book_on_order.objects.bulk_create(book_links)
+    mark_orders_dirty([order for order, _ in orders_books])
+    return requested_books
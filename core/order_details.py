@@ -0,0 +1,81 @@
+from django.db.models import Prefetch
+from .models import Order, Book_on_order, Requested_book_additive
+from .production_spec import production_spec
+
+
+def full_details_queryset(queryset=None):
+    if queryset is None:
+        queryset = Order.objects.all()
+
+    additives = Prefetch(
+        'idRequested_book__requested_book_additive_set',
+        queryset=Requested_book_additive.objects.select_related('idAdditive').order_by('id'),
+        to_attr='prefetched_additives'
+    )
+    book_links = Prefetch(
+        'book_on_order_set',
+        queryset=(
+            Book_on_order.objects
+            .select_related('idRequested_book__idBook')
+            .prefetch_related(additives)
+            .order_by('id')
+        ),
+        to_attr='prefetched_links'
+    )
+    return queryset.select_related('idClient', 'idDelivery').prefetch_related(book_links)
+
+
+def build_book_details(link):
+    requested_book = link.idRequested_book
+    book = requested_book.idBook
+    additives = requested_book.prefetched_additives
+    return {
+        "idRequested_book": requested_book.idRequested_book,
+        "book": {
+            "idBook": book.idBook,
+            "title": book.title,
+            "author": book.author,
+            "number_pages": book.number_pages,
+            "printing_format": book.printing_format,
+            "color_pages": book.color_pages
+        },
+        "additives": [
+            {
+                "idAdditive": add.idAdditive.idAdditive,
+                "name": add.idAdditive.name,
+                "price": add.additive_price
+            }
+            for add in additives
+        ],
+        "production": production_spec(book, [add.idAdditive.name for add in additives]),
+        "discount": link.discount,
+        "ready": link.ready,
+        "quantity": link.quantity,
+        "base_price": link.base_price
+    }
+
+
+def build_order_details(order):
+    return {
+        "idOrder": order.idOrder,
+        "_type": order._type,
+        "address": order.address,
+        "order_date": order.order_date,
+        "delivery_date": order.delivery_date,
+        "total_price": order.total_price,
+        "pay_method": order.pay_method,
+        "done": order.done,
+        "payment_advance": order.payment_advance,
+        "outstanding_payment": order.outstanding_payment,
+        "added_to_excel": order.added_to_excel,
+        "delivery_zone": order.idDelivery.zone if order.idDelivery else None,
+        "delivery_price": order.idDelivery.price if order.idDelivery else 0,
+        "discount": order.discount,
+        "client": {
+            "idClient": order.idClient.idClient,
+            "name": order.idClient.name,
+            "phone_number": order.idClient.phone_number,
+            "identity": order.idClient.identity,
+        },
+        "books": [build_book_details(link) for link in order.prefetched_links]
+    }
@@ -0,0 +1,219 @@
+import csv
+import io
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import Client, Delivery, Book, Additive, Order
+from .order_creation import bulk_create_order_books
+
+REQUIRED_FIELDS = ['idClient', 'idDelivery', 'order_date', 'delivery_date', 'total_price', 'pay_method']
+TRUE_VALUES = ('1', 'true', 'yes', 'si', 'sí')
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _to_date(value):
+    return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+
+
+def _to_id_list(value):
+    if isinstance(value, list):
+        return [int(v) for v in value]
+    return [int(v) for v in str(value or '').replace(';', ',').split(',') if v.strip()]
+
+
+# Convierte un CSV con una fila por libro en órdenes con el formato de
+# create_full_order. Las filas con el mismo `order_ref` forman una orden.
+def rows_from_csv(text):
+    orders = {}
+    for line in csv.DictReader(io.StringIO(text)):
+        line = {k.strip(): (v or '').strip() for k, v in line.items() if k}
+        ref = line.get('order_ref') or f"_{len(orders)}"
+        order = orders.get(ref)
+        if order is None:
+            order = {
+                k: v for k, v in line.items()
+                if k not in ('order_ref', 'idBook', 'additives', 'quantity', 'book_discount', 'base_price', 'ready') and v != ''
+            }
+            order['requested_books'] = []
+            orders[ref] = order
+        if line.get('idBook'):
+            order['requested_books'].append({
+                'idBook': line['idBook'],
+                'additives': line.get('additives', ''),
+                'quantity': line.get('quantity') or 1,
+                'discount': line.get('book_discount') or 0,
+                'base_price': line.get('base_price') or 0,
+                'ready': line.get('ready') or False,
+            })
+    return list(orders.values())
+
+
+# Acepta una lista de órdenes o {"orders": [...]}, igual en el endpoint y en
+# el comando import_orders.
+def orders_from_data(data):
+    if isinstance(data, dict) and 'orders' in data:
+        data = data['orders']
+    if not isinstance(data, list):
+        raise ValueError('Se esperaba una lista de órdenes')
+    return data
+
+
+def _parse_order(row, clients, deliveries, books, additives):
+    errors = {}
+    missing = [f for f in REQUIRED_FIELDS if row.get(f) in (None, '')]
+    for field in missing:
+        errors[field] = 'Este campo es requerido.'
+    if missing:
+        return None, None, errors
+
+    try:
+        client_id = int(row['idClient'])
+        if client_id not in clients:
+            errors['idClient'] = f'Cliente {client_id} no existe.'
+    except (TypeError, ValueError):
+        errors['idClient'] = 'Debe ser un entero.'
+    try:
+        delivery_id = int(row['idDelivery'])
+        if delivery_id not in deliveries:
+            errors['idDelivery'] = f'Mensajería {delivery_id} no existe.'
+    except (TypeError, ValueError):
+        errors['idDelivery'] = 'Debe ser un entero.'
+
+    values = {}
+    for field in ('order_date', 'delivery_date'):
+        try:
+            values[field] = _to_date(row[field])
+        except ValueError:
+            errors[field] = 'Formato de fecha inválido, use AAAA-MM-DD.'
+    for field, default in (('total_price', None), ('payment_advance', 0), ('discount', 0)):
+        try:
+            values[field] = float(row.get(field, default) or 0)
+        except (TypeError, ValueError):
+            errors[field] = 'Debe ser un número.'
+
+    requested_books = []
+    for i, rb in enumerate(row.get('requested_books') or []):
+        try:
+            book = {
+                'idBook': int(rb['idBook']),
+                'additives': _to_id_list(rb.get('additives', [])),
+                'quantity': int(rb.get('quantity', 1) or 1),
+                'discount': float(rb.get('discount', 0) or 0),
+                'base_price': float(rb.get('base_price', 0) or 0),
+                'ready': to_bool(rb.get('ready', False)),
+            }
+        except (KeyError, TypeError, ValueError):
+            errors[f'requested_books[{i}]'] = 'Datos del libro inválidos.'
+            continue
+        if book['idBook'] not in books:
+            errors[f'requested_books[{i}]'] = f"Libro {book['idBook']} no existe."
+        unknown = [a for a in book['additives'] if a not in additives]
+        if unknown:
+            errors[f'requested_books[{i}]'] = f'Aditivos no encontrados: {unknown}'
+        requested_books.append(book)
+
+    if errors:
+        return None, None, errors
+
+    order = Order(
+        idClient_id=client_id,
+        idDelivery_id=delivery_id,
+        _type=row.get('_type') or 'Regular',
+        address=row.get('address') or None,
+        pay_method=row['pay_method'],
+        done=to_bool(row.get('done', False)),
+        added_to_excel=to_bool(row.get('added_to_excel', False)),
+        **values
+    )
+    order.update_outstanding_payment()
+    try:
+        # Cliente y mensajería ya se validaron contra los ids existentes
+        order.full_clean(exclude=['idClient', 'idDelivery'], validate_unique=False, validate_constraints=False)
+    except ValidationError as e:
+        return None, None, {field: ' '.join(messages) for field, messages in e.message_dict.items()}
+    return order, requested_books, None
+
+
+def _referenced_ids(rows, key):
+    ids = set()
+    for row in rows:
+        try:
+            ids.add(int(row.get(key)))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return ids
+
+
+def _referenced_catalog_ids(rows):
+    book_ids, additive_ids = set(), set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        for rb in row.get('requested_books') or []:
+            try:
+                book_ids.add(int(rb.get('idBook')))
+                additive_ids.update(_to_id_list(rb.get('additives', [])))
+            except (AttributeError, TypeError, ValueError):
+                pass
+    return book_ids, additive_ids
+
+
+def _insert_orders(valid):
+    with transaction.atomic():
+        for _, order, _ in valid:
+            order.pk = None
+        orders = Order.objects.bulk_create([order for _, order, _ in valid])
+        bulk_create_order_books([
+            (order, requested_books) for order, (_, _, requested_books) in zip(orders, valid)
+        ])
+    return [order.idOrder for order in orders]
+
+
+# Valida e inserta órdenes en lotes de `chunk_size`, cada lote en su propia
+# transacción. Las filas inválidas se reportan sin abortar el resto.
+def import_orders(rows, chunk_size=500):
+    created = []
+    errors = []
+    if not rows:
+        return {'created': created, 'errors': errors}
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        book_ids, additive_ids = _referenced_catalog_ids(chunk)
+        clients = set(Client.objects.filter(pk__in=_referenced_ids(chunk, 'idClient')).values_list('pk', flat=True))
+        deliveries = set(Delivery.objects.filter(pk__in=_referenced_ids(chunk, 'idDelivery')).values_list('pk', flat=True))
+        books = set(Book.objects.filter(pk__in=book_ids).values_list('pk', flat=True))
+        additives = set(Additive.objects.filter(pk__in=additive_ids).values_list('pk', flat=True))
+
+        valid = []
+        for offset, row in enumerate(chunk):
+            if not isinstance(row, dict):
+                errors.append({'row': start + offset, 'errors': {'row': 'Se esperaba un objeto.'}})
+                continue
+            order, requested_books, row_errors = _parse_order(row, clients, deliveries, books, additives)
+            if row_errors:
+                errors.append({'row': start + offset, 'errors': row_errors})
+            else:
+                valid.append((start + offset, order, requested_books))
+
+        if not valid:
+            continue
+
+        try:
+            created.extend(_insert_orders(valid))
+        except Exception:
+            # Algo que la validación no detectó: se reintenta fila a fila,
+            # cada una en su savepoint, para reportar solo las que fallan
+            for row in valid:
+                try:
+                    created.extend(_insert_orders([row]))
+                except Exception as e:
+                    errors.append({'row': row[0], 'errors': {'row': f'Error guardando la orden: {str(e)}'}})
+        errors.sort(key=lambda error: error['row'])
+
+    return {'created': created, 'errors': errors}
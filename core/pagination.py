@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = 'pk'
+
+    # Solo se pagina si el cliente lo pide con ?cursor= o ?page_size=
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and \
+                self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    # ?ordering=campo / -campo entre los permitidos por la vista; pk desempata
+    def get_ordering(self, request, queryset, view):
+        allowed = getattr(view, 'cursor_ordering_fields', ())
+        requested = request.query_params.get('ordering', '').strip()
+        if requested and requested.lstrip('-') in allowed:
+            tiebreaker = '-pk' if requested.startswith('-') else 'pk'
+            return (requested, tiebreaker)
+        return ('pk',)
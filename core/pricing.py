@@ -0,0 +1,111 @@
+import math
+import re
+from django.conf import settings
+from .models import Production_costs
+from .conditional import get_table_versions
+
+BASE_CURRENCY = 'USD'
+COST_CURRENCY = 'CUP'
+RATE_PREFIX = 'tasa '
+MIN_PRICE = 9
+COVER_RE = re.compile(r'^\s*(car[aá]tula.*?)\s*\((normal|grande)\)\s*$', re.IGNORECASE)
+FIXED_COSTS = {
+    'normal': ('flexibado', 'repelado', 'acetato', 'ziplo', 'otros costos', 'Marcador', 'Tarjeta de regalo'),
+    'grande': ('flexibado', 'repelado', 'acetato', 'otros costos', 'Marcador', 'Tarjeta de regalo'),
+}
+
+# Copia en memoria de los costos y tasas; se recarga cuando cambia la
+# versión de la tabla Production_costs (ver conditional.bump_table_version).
+_tables = {'version': None, 'costs': {}, 'rates': {}}
+
+
+class PricingError(ValueError):
+    pass
+
+
+def _load_tables():
+    costs = dict(Production_costs.objects.values_list('product', 'product_price'))
+    # Unidades de cada moneda por 1 USD. Las filas "tasa CUP", "tasa MLC" de
+    # Production_costs tienen prioridad sobre settings.EXCHANGE_RATES.
+    rates = {BASE_CURRENCY: 1.0}
+    rates.update({k: float(v) for k, v in getattr(settings, 'EXCHANGE_RATES', {}).items() if v})
+    for product, price in costs.items():
+        if product.lower().startswith(RATE_PREFIX) and price:
+            rates[product[len(RATE_PREFIX):].strip().upper()] = float(price)
+    return costs, rates
+
+
+def invalidate_pricing_tables():
+    _tables['version'] = None
+
+
+def get_pricing_tables():
+    version = get_table_versions([Production_costs._meta.db_table])[0]
+    if _tables['version'] != version:
+        costs, rates = _load_tables()
+        _tables.update(version=version, costs=costs, rates=rates)
+    return _tables['costs'], _tables['rates']
+
+
+def convert(amount, rates, from_currency, to_currency):
+    if from_currency == to_currency:
+        return amount
+    try:
+        return amount / rates[from_currency] * rates[to_currency]
+    except KeyError as e:
+        raise PricingError(f'Tasa de cambio no configurada: {e.args[0]}')
+
+
+# Precio base en USD de un libro sin aditivos; mismo cálculo que
+# frontend/price/price.py::calculate_price.
+def book_base_price(pages, color_pages, printing_format, costs, rates):
+    if pages <= 0 or color_pages < 0 or color_pages > pages:
+        return 0
+    printing_format = (printing_format or 'normal').lower()
+    if printing_format not in FIXED_COSTS:
+        raise PricingError(f'Formato de impresión desconocido: {printing_format}')
+
+    try:
+        sheets = 4 if printing_format == 'normal' else 2
+        printing_cost = (
+            (costs['Imprimir una hoja en BN'] + costs['Precio de una hoja']) * (pages / sheets) +
+            (costs['Imprimir una hoja en color'] + costs['Precio de una hoja']) * (color_pages / sheets)
+        )
+        fixed = sum(costs[name] for name in FIXED_COSTS[printing_format])
+        if printing_format == 'normal':
+            cover = costs['pliego A3'] if pages > 500 or color_pages > 500 else costs['pliego A3'] / 2
+            factor = 1
+        else:
+            cover = costs['pliego A3']
+            factor = 0.8
+        multiplier = costs['multiplicador']
+    except KeyError as e:
+        raise PricingError(f'Costo de producción no configurado: {e.args[0]}')
+
+    cost_usd = convert(float(printing_cost + cover + fixed), rates, COST_CURRENCY, BASE_CURRENCY)
+    return max(math.floor(cost_usd * multiplier * factor), MIN_PRICE)
+
+
+# Precio de un libro con aditivos: la carátula entra en el descuento, el resto
+# de aditivos (servicios) se suma por ejemplar después del descuento.
+def quote_book(base_price, additives, discount=0, quantity=1):
+    cover_price = 0
+    extras_price = 0
+    for name, price in additives:
+        if name.lower().strip().startswith(('carátula', 'caratula')):
+            cover_price = price
+        else:
+            extras_price += price
+    unit_price = (base_price + cover_price) * (1 - discount / 100.0) + extras_price
+    return unit_price, unit_price * quantity
+
+
+# {"normal": {"Carátula dura": 5.0}, "grande": {...}} a partir de los aditivos
+# con nombres del tipo "Carátula dura (normal)".
+def cover_variants(additives):
+    covers = {}
+    for name, price in additives:
+        match = COVER_RE.match(name or '')
+        if match:
+            covers.setdefault(match.group(2).lower(), {})[match.group(1).strip().capitalize()] = price
+    return covers
@@ -0,0 +1,49 @@
+import unicodedata
+
+SERVICE_PREFIX = 'servicio'
+COVER_PREFIX = 'caratula'
+
+
+def _plain(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def spine_width(number_pages, cover_type):
+    if cover_type in ('dura', 'dura_premium'):
+        return round(number_pages / 170 + 0.5, 2)
+    return round(number_pages / 170 + 0.1, 4)
+
+
+# Datos de producción de un libro a partir de sus aditivos:
+#   service: letra del servicio ("R" regular, "E" express, "P" premium express)
+#   cover / cover_type / cover_name: carátula ("normal" si no hay aditivo)
+#   format: "G" grande o "N" normal, spine_width: lomo en cm
+def production_spec(book, additive_names):
+    service = 'R'
+    cover_name = None
+    for name in additive_names:
+        plain = _plain(name)
+        if service == 'R' and plain.startswith(SERVICE_PREFIX) and len(name) > len(SERVICE_PREFIX) + 1:
+            service = name[len(SERVICE_PREFIX) + 1].upper()
+        if cover_name is None and plain.startswith(COVER_PREFIX):
+            cover_name = name
+
+    cover = 'normal'
+    cover_type = 'normal'
+    if cover_name is not None:
+        cover = cover_name[len(COVER_PREFIX) + 1:]
+        plain = _plain(cover_name)
+        if 'dura' in plain:
+            cover_type = 'dura_premium' if 'premium' in plain else 'dura'
+        elif 'solapa' in plain:
+            cover_type = 'solapa'
+
+    return {
+        'service': service,
+        'cover': cover,
+        'cover_type': cover_type,
+        'cover_name': cover_name,
+        'format': 'G' if (book.printing_format or '').lower().startswith('g') else 'N',
+        'spine_width': spine_width(book.number_pages or 0, cover_type),
+    }
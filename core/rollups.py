@@ -0,0 +1,131 @@
+import threading
+from datetime import date
+from django.db import transaction
+from django.db.models import Count, Sum, F, Q
+from django.db.models.functions import TruncMonth
+from .models import Order, Book_on_order, Daily_sales, Monthly_book_sales
+from .dashboard_cache import invalidate_dashboard_cache, invalidate_dashboard_cache_on_commit
+
+_pending = threading.local()
+
+
+def _as_date(day):
+    if isinstance(day, str):
+        return date.fromisoformat(day)
+    return day
+
+
+def _month_filter(months):
+    condition = Q()
+    for month in months:
+        next_month = month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+        condition |= Q(idOrder__order_date__gte=month, idOrder__order_date__lt=next_month)
+    return condition
+
+
+# Recalcula desde Order/Book_on_order las filas de resumen de los días dados
+# y de los meses a los que pertenecen.
+def refresh_rollups(days):
+    days = {_as_date(day) for day in days if day}
+    if not days:
+        return
+
+    order_totals = {
+        row['order_date']: row
+        for row in Order.objects.filter(order_date__in=days)
+        .values('order_date')
+        .annotate(orders=Count('idOrder'), revenue=Sum('total_price'))
+    }
+    book_totals = dict(
+        Book_on_order.objects.filter(idOrder__order_date__in=days)
+        .values('idOrder__order_date')
+        .annotate(books=Sum('quantity'))
+        .values_list('idOrder__order_date', 'books')
+    )
+
+    with transaction.atomic():
+        Daily_sales.objects.filter(day__in=days).exclude(day__in=list(order_totals)).delete()
+        Daily_sales.objects.bulk_create(
+            [
+                Daily_sales(
+                    day=day,
+                    orders=row['orders'],
+                    revenue=round(row['revenue'] or 0, 2),
+                    books=book_totals.get(day) or 0
+                )
+                for day, row in order_totals.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['day'],
+            update_fields=['orders', 'revenue', 'books']
+        )
+
+        months = {day.replace(day=1) for day in days}
+        Monthly_book_sales.objects.filter(month__in=months).delete()
+        Monthly_book_sales.objects.bulk_create(
+            _monthly_book_rows(Book_on_order.objects.filter(_month_filter(months)))
+        )
+
+    invalidate_dashboard_cache()
+
+
+def _monthly_book_rows(book_links):
+    rows = (
+        book_links
+        .annotate(month=TruncMonth('idOrder__order_date'), book=F('idRequested_book__idBook'))
+        .values('month', 'book')
+        .annotate(total=Sum('quantity'))
+    )
+    return [
+        Monthly_book_sales(month=row['month'], idBook_id=row['book'], quantity=row['total'] or 0)
+        for row in rows
+    ]
+
+
+@transaction.atomic
+def rebuild_rollups():
+    Daily_sales.objects.all().delete()
+    Monthly_book_sales.objects.all().delete()
+
+    book_totals = dict(
+        Book_on_order.objects.values('idOrder__order_date')
+        .annotate(books=Sum('quantity'))
+        .values_list('idOrder__order_date', 'books')
+    )
+    Daily_sales.objects.bulk_create([
+        Daily_sales(
+            day=row['order_date'],
+            orders=row['orders'],
+            revenue=round(row['revenue'] or 0, 2),
+            books=book_totals.get(row['order_date']) or 0
+        )
+        for row in Order.objects.values('order_date').annotate(orders=Count('idOrder'), revenue=Sum('total_price'))
+    ], batch_size=1000)
+    Monthly_book_sales.objects.bulk_create(_monthly_book_rows(Book_on_order.objects.all()), batch_size=1000)
+    invalidate_dashboard_cache_on_commit()
+
+
+def _flush_pending():
+    days = getattr(_pending, 'days', None) or set()
+    _pending.days = set()
+    _pending.hooks = None
+    refresh_rollups(days)
+
+
+# Marca días como pendientes. Dentro de una transacción se acumulan y se
+# recalculan una sola vez al hacer commit.
+def mark_days_dirty(days):
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        refresh_rollups(days)
+        return
+
+    if getattr(_pending, 'hooks', None) is not connection.run_on_commit:
+        _pending.days = set(getattr(_pending, 'days', None) or ())
+        transaction.on_commit(_flush_pending)
+        _pending.hooks = connection.run_on_commit
+    _pending.days.update(day for day in days if day)
+
+
+def mark_orders_dirty(orders):
+    mark_days_dirty({order.order_date for order in orders})
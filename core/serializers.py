@@ -129,6 +129,8 @@ class BookOnOrderSerializer(serializers.ModelSerializer):
 #? ----------------------------
 class OrderSerializer(serializers.ModelSerializer):
     client_name = serializers.CharField(source='idClient.name', read_only=True)
+    client_identity = serializers.CharField(source='idClient.identity', read_only=True)
+    client_phone_number = serializers.CharField(source='idClient.phone_number', read_only=True)
     delivery_name = serializers.CharField(source='idDelivery.zone', read_only=True)
     requested_books = RequestedBookSerializer(many=True, write_only=True, required=False)
 
@@ -142,6 +144,8 @@ class OrderSerializer(serializers.ModelSerializer):
             'delivery_name',
             'idClient',
             'client_name',
+            'client_identity',
+            'client_phone_number',
             'order_date',
             'delivery_date',
             'total_price',
@@ -164,3 +168,25 @@ class ProductionCostsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Production_costs
         fields = ['idProduction_costs', 'product', 'product_price']
+
+#? ----------------------------
+#? Quote
+#? ----------------------------
+class QuoteItemSerializer(serializers.Serializer):
+    idBook = serializers.IntegerField(required=False, allow_null=True)
+    number_pages = serializers.IntegerField(required=False)
+    color_pages = serializers.IntegerField(required=False)
+    printing_format = serializers.CharField(required=False, allow_blank=True)
+    additives = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    discount = serializers.FloatField(required=False, default=0, min_value=0, max_value=100)
+    quantity = serializers.IntegerField(required=False, default=1, min_value=1)
+
+    def validate(self, attrs):
+        if attrs.get('idBook') is None and (attrs.get('number_pages') is None or not attrs.get('printing_format')):
+            raise serializers.ValidationError('Either idBook or number_pages and printing_format are required.')
+        return attrs
+
+
+class QuoteSerializer(serializers.Serializer):
+    items = QuoteItemSerializer(many=True)
+    currencies = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=True)
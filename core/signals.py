@@ -0,0 +1,125 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import (
+    Client, Order, Book_on_order, Book, Additive, Delivery, Production_costs,
+    Production_costs_history, Requested_book, Requested_book_additive
+)
+from .rollups import mark_days_dirty
+from .dashboard_cache import invalidate_dashboard_cache_on_commit
+from .conditional import bump_table_version
+from .sync import record_deletion
+from .pricing import invalidate_pricing_tables
+from .book_prices import mark_book_prices_dirty, additive_scope, production_cost_scope
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_order_date(sender, instance, **kwargs):
+    instance._previous_order_date = None
+    if instance.pk:
+        instance._previous_order_date = (
+            Order.objects.filter(pk=instance.pk).values_list('order_date', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    mark_days_dirty({instance.order_date, getattr(instance, '_previous_order_date', None)})
+
+
+@receiver(post_save, sender=Book_on_order)
+@receiver(post_delete, sender=Book_on_order)
+def book_on_order_changed(sender, instance, **kwargs):
+    if Book_on_order.idOrder.is_cached(instance):
+        order_date = instance.idOrder.order_date
+    else:
+        order_date = Order.objects.filter(pk=instance.idOrder_id).values_list('order_date', flat=True).first()
+    mark_days_dirty({order_date})
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_changed(sender, instance, **kwargs):
+    invalidate_dashboard_cache_on_commit()
+
+
+# Los aditivos de cada libro pedido entran en el análisis de márgenes
+@receiver(post_save, sender=Requested_book_additive)
+@receiver(post_delete, sender=Requested_book_additive)
+def requested_book_additive_changed(sender, instance, **kwargs):
+    invalidate_dashboard_cache_on_commit()
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Additive)
+@receiver(post_delete, sender=Additive)
+@receiver(post_save, sender=Delivery)
+@receiver(post_delete, sender=Delivery)
+@receiver(post_save, sender=Production_costs)
+@receiver(post_delete, sender=Production_costs)
+def catalog_changed(sender, instance, **kwargs):
+    bump_table_version(sender._meta.db_table)
+    if sender is Production_costs:
+        invalidate_pricing_tables()
+
+
+
+@receiver(post_save, sender=Book)
+def book_prices_changed(sender, instance, **kwargs):
+    mark_book_prices_dirty({instance.pk})
+    invalidate_dashboard_cache_on_commit()
+
+
+# Historial de costos para el análisis de márgenes (core/margins.py);
+# una eliminación se registra con precio nulo.
+@receiver(post_save, sender=Production_costs)
+@receiver(post_delete, sender=Production_costs)
+def record_production_cost(sender, instance, **kwargs):
+    Production_costs_history.objects.create(
+        product=instance.product,
+        product_price=None if kwargs['signal'] is post_delete else instance.product_price,
+        changed_at=timezone.now()
+    )
+    invalidate_dashboard_cache_on_commit()
+
+
+@receiver(pre_save, sender=Additive)
+@receiver(pre_save, sender=Production_costs)
+def remember_previous_name(sender, instance, **kwargs):
+    field = 'name' if sender is Additive else 'product'
+    instance._previous_name = None
+    if instance.pk:
+        instance._previous_name = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+# Solo se recalculan las filas de Book_price que dependen del aditivo o del
+# costo (con el nombre anterior y el actual, por si se renombró).
+@receiver(post_save, sender=Additive)
+@receiver(post_delete, sender=Additive)
+@receiver(post_save, sender=Production_costs)
+@receiver(post_delete, sender=Production_costs)
+def catalog_prices_changed(sender, instance, **kwargs):
+    if sender is Additive:
+        scope_of, name = additive_scope, instance.name
+    else:
+        scope_of, name = production_cost_scope, instance.product
+    scope = {}
+    for value in {name, getattr(instance, '_previous_name', None)} - {None}:
+        for key, items in scope_of(value).items():
+            scope.setdefault(key, set()).update(items)
+    if scope:
+        mark_book_prices_dirty((), **scope)
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Delivery)
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Additive)
+@receiver(post_delete, sender=Requested_book)
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=Book_on_order)
+@receiver(post_delete, sender=Requested_book_additive)
+@receiver(post_delete, sender=Production_costs)
+def record_tombstone(sender, instance, **kwargs):
+    record_deletion(instance)
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import (
+    Client, Delivery, Book, Additive, Requested_book, Order, Book_on_order,
+    Requested_book_additive, Production_costs, Deleted_record
+)
+from .serializers import (
+    ClientSerializer, DeliverySerializer, BookSerializer, AdditiveSerializer, RequestedBookSerializer,
+    OrderSerializer, BookOnOrderSerializer, RequestedBookAdditiveSerializer, ProductionCostsSerializer
+)
+
+# Tablas sincronizables: nombre en la API -> (modelo, serializer, select_related)
+SYNC_TABLES = {
+    'clients': (Client, ClientSerializer, ()),
+    'deliveries': (Delivery, DeliverySerializer, ()),
+    'books': (Book, BookSerializer, ()),
+    'additives': (Additive, AdditiveSerializer, ()),
+    'requested_books': (Requested_book, RequestedBookSerializer, ('idBook',)),
+    'orders': (Order, OrderSerializer, ('idClient', 'idDelivery')),
+    'books_on_order': (Book_on_order, BookOnOrderSerializer, ('idRequested_book__idBook', 'idOrder')),
+    'requested_book_additives': (Requested_book_additive, RequestedBookAdditiveSerializer, ('idRequested_book__idBook', 'idAdditive')),
+    'production_costs': (Production_costs, ProductionCostsSerializer, ()),
+}
+
+SYNC_PAGE_SIZE = 1000
+MAX_SYNC_PAGE_SIZE = 5000
+SYNC_OVERLAP = timedelta(seconds=getattr(settings, 'SYNC_OVERLAP_SECONDS', 300))
+
+SYNC_TABLE_BY_MODEL = {model: name for name, (model, _, _) in SYNC_TABLES.items()}
+
+
+def record_deletion(instance):
+    table = SYNC_TABLE_BY_MODEL.get(type(instance))
+    if table is not None:
+        Deleted_record.objects.create(table=table, record_id=str(instance.pk))
+
+
+# Cursor de paginación "tabla:último_pk:server_time". El server_time de la
+# primera página viaja en el cursor para que todas devuelvan el mismo.
+def encode_cursor(table, after_pk, server_time):
+    return f"{table}:{after_pk}:{server_time.isoformat()}"
+
+
+def decode_cursor(cursor):
+    table, after_pk, raw_time = cursor.split(':', 2)
+    server_time = parse_datetime(raw_time)
+    if table not in SYNC_TABLES or server_time is None:
+        raise ValueError(cursor)
+    return table, int(after_pk), server_time
+
+
+# Filas creadas/modificadas y borradas desde `since` (None = todo) por tabla,
+# en páginas de como mucho `page_size` filas recorriendo las tablas en orden;
+# `next` es el cursor de la siguiente página o None en la última.
+#
+# `updated_at` se fija al guardar, no al hacer commit: una transacción que
+# guarda antes de `server_time` y confirma después tendría filas anteriores
+# al siguiente `since`. Por eso se consulta desde `since - SYNC_OVERLAP`; el
+# cliente recibe de nuevo algunas filas ya vistas y las actualiza por pk.
+# Solo se pierden cambios de transacciones más largas que el solapamiento.
+def collect_changes(since=None, tables=None, cursor=None, page_size=None):
+    tables = list(tables or SYNC_TABLES)
+    page_size = page_size or SYNC_PAGE_SIZE
+    if cursor:
+        start_table, after_pk, server_time = decode_cursor(cursor)
+        if start_table not in tables:
+            raise ValueError(cursor)
+        tables = tables[tables.index(start_table):]
+    else:
+        after_pk, server_time = 0, timezone.now()
+    if since is not None:
+        since = since - SYNC_OVERLAP
+
+    changes = {}
+    next_cursor = None
+    remaining = page_size
+    for index, table in enumerate(tables):
+        if remaining == 0:
+            next_cursor = encode_cursor(table, 0, server_time)
+            break
+        model, serializer_class, related = SYNC_TABLES[table]
+        qs = model.objects.select_related(*related).filter(pk__gt=after_pk).order_by('pk')
+        after_pk = 0
+        if since is not None:
+            qs = qs.filter(updated_at__gte=since)
+        rows = list(qs[:remaining + 1])
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            next_cursor = encode_cursor(table, rows[-1].pk, server_time)
+        changes[table] = serializer_class(rows, many=True).data
+        if next_cursor:
+            break
+        remaining -= len(rows)
+
+    deleted = {}
+    if since is not None and not cursor:
+        for table in tables:
+            tombstones = Deleted_record.objects.filter(table=table, deleted_at__gte=since)
+            deleted[table] = [int(pk) for pk in tombstones.values_list('record_id', flat=True)]
+    return {'server_time': server_time, 'changes': changes, 'deleted': deleted, 'next': next_cursor}
@@ -1,3 +1,801 @@
+import json
+from unittest import mock
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import (Client, Delivery, Book, Additive, Requested_book, Book_on_order, Order, Requested_book_additive,
+                     Daily_sales, Monthly_book_sales, Production_costs, Production_costs_history, Book_price)
+from .rollups import rebuild_rollups
+from .book_prices import refresh_book_prices
+from .order_import import import_orders, rows_from_csv
 
-# Create your tests here.
+
+def create_order(client, delivery, books, additives, order_date="2025-11-03"):
+    order = Order.objects.create(
+        idClient=client,
+        idDelivery=delivery,
+        order_date=order_date,
+        delivery_date="2025-12-03",
+        total_price=100,
+        pay_method="Efectivo",
+        done=False,
+        payment_advance=0,
+        outstanding_payment=0
+    )
+    for book in books:
+        requested_book = Requested_book.objects.create(idBook=book)
+        for additive in additives:
+            Requested_book_additive.objects.create(
+                idRequested_book=requested_book,
+                idAdditive=additive,
+                additive_price=additive.price
+            )
+        Book_on_order.objects.create(
+            idRequested_book=requested_book,
+            idOrder=order,
+            discount=0,
+            ready=False,
+            quantity=1,
+            base_price=10
+        )
+    return order
+
+
+class OrderFullDetailsTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.client_obj = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        self.delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.additives = [
+            Additive.objects.create(name="Carátula dura", price=3),
+            Additive.objects.create(name="Servicio Express", price=2),
+        ]
+
+    def _books(self, count):
+        return [
+            Book.objects.create(title=f"Libro {i}", author="Autor", number_pages=200,
+                                printing_format="normal", color_pages=0)
+            for i in range(count)
+        ]
+
+    def test_full_details_payload(self):
+        order = create_order(self.client_obj, self.delivery, self._books(2), self.additives)
+        response = self.api.get(f"/api/orders/{order.pk}/full_details/")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["client"]["name"], "Ana")
+        self.assertEqual(data["delivery_zone"], "Centro")
+        self.assertEqual(len(data["books"]), 2)
+        self.assertEqual([a["name"] for a in data["books"][0]["additives"]],
+                         ["Carátula dura", "Servicio Express"])
+        self.assertEqual(data["books"][0]["production"], {
+            "service": "E", "cover": "dura", "cover_type": "dura", "cover_name": "Carátula dura",
+            "format": "N", "spine_width": round(200 / 170 + 0.5, 2),
+        })
+
+    def test_full_details_query_count_is_constant(self):
+        small = create_order(self.client_obj, self.delivery, self._books(1), self.additives)
+        large = create_order(self.client_obj, self.delivery, self._books(20), self.additives)
+        with self.assertNumQueries(3):
+            self.api.get(f"/api/orders/{small.pk}/full_details/")
+        with self.assertNumQueries(3):
+            self.api.get(f"/api/orders/{large.pk}/full_details/")
+
+    def test_bulk_full_details_filters(self):
+        first = create_order(self.client_obj, self.delivery, self._books(3), self.additives)
+        second = create_order(self.client_obj, self.delivery, self._books(3), self.additives)
+        Order.objects.filter(pk=first.pk).update(added_to_excel=True)
+
+        with self.assertNumQueries(3):
+            response = self.api.get("/api/orders/bulk_full_details/", {"added_to_excel": "false"})
+        self.assertEqual([o["idOrder"] for o in response.json()], [second.pk])
+
+        response = self.api.get("/api/orders/bulk_full_details/", {"ids": f"{first.pk},{second.pk}"})
+        self.assertEqual(len(response.json()), 2)
+
+
+class OrderSearchTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.ana = Client.objects.create(name="Ana Pérez", phone_number="53123456", identity="900101")
+        self.luis = Client.objects.create(name="Luis", phone_number="53999999", identity="880202")
+        self.ana_order = create_order(self.ana, delivery, [], [])
+        self.luis_order = create_order(self.luis, delivery, [], [])
+
+    def test_search_matches_client_fields_and_id(self):
+        response = self.api.get("/api/orders/search/", {"q": "pérez"})
+        self.assertEqual([o["idOrder"] for o in response.json()["results"]], [self.ana_order.pk])
+
+        response = self.api.get("/api/orders/search/", {"q": "880202"})
+        self.assertEqual(response.json()["results"][0]["client_phone_number"], "53999999")
+
+        response = self.api.get("/api/orders/search/", {"q": str(self.luis_order.pk)})
+        self.assertIn(self.luis_order.pk, [o["idOrder"] for o in response.json()["results"]])
+        self.assertEqual(self.api.get("/api/orders/search/", {"q": "²"}).json()["results"], [])
+
+    def test_search_is_limited(self):
+        response = self.api.get("/api/orders/search/", {"q": "53", "limit": 1})
+        data = response.json()
+        self.assertEqual([o["idOrder"] for o in data["results"]], [self.luis_order.pk])
+        self.assertTrue(data["has_more"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        for i, title in enumerate(["C", "A", "B", "A"]):
+            Book.objects.create(title=title, author=f"Autor {i}", number_pages=100,
+                                printing_format="normal", color_pages=0)
+
+    def test_list_without_cursor_returns_everything(self):
+        response = self.api.get("/api/books/")
+        self.assertEqual(len(response.json()), 4)
+
+    def test_pages_follow_stable_order(self):
+        titles = []
+        url, params = "/api/books/", {"page_size": 3, "ordering": "title"}
+        while url:
+            data = self.api.get(url, params).json()
+            titles.extend(b["title"] for b in data["results"])
+            url, params = data["next"], None
+        self.assertEqual(titles, ["A", "A", "B", "C"])
+
+
+class ClientSearchWithOrdersTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        for i in range(5):
+            client = Client.objects.create(name=f"Cliente {i}", phone_number=f"5300{i}", identity=f"ID{i}")
+            for address in ["Calle 1 ", "Calle 1", "Calle 2", None]:
+                order = create_order(client, delivery, [], [])
+                order.address = address
+                order.save()
+
+    def test_query_count_does_not_depend_on_matches(self):
+        with self.assertNumQueries(3):
+            response = self.api.get("/api/clients/search_with_orders/", {"q": "cliente"})
+        clients = response.json()["clients"]
+        self.assertEqual(len(clients), 5)
+        self.assertEqual(clients[0]["total_orders"], 4)
+        self.assertEqual(sorted(clients[0]["unique_addresses"]), ["Calle 1", "Calle 2"])
+
+    def test_results_are_capped(self):
+        data = self.api.get("/api/clients/search_with_orders/", {"q": "cliente", "limit": 2, "offset": 2}).json()
+        self.assertEqual([c["name"] for c in data["clients"]], ["Cliente 2", "Cliente 3"])
+        self.assertTrue(data["has_more"])
+
+
+class CreateFullOrderTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.client_obj = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        self.delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.additives = [
+            Additive.objects.create(name="Carátula dura", price=3),
+            Additive.objects.create(name="Servicio Express", price=2),
+        ]
+
+    def _payload(self, books, additive_ids):
+        return {
+            "idClient": self.client_obj.pk,
+            "idDelivery": self.delivery.pk,
+            "order_date": "2025-11-03",
+            "delivery_date": "2025-12-03",
+            "total_price": 100,
+            "pay_method": "Efectivo",
+            "done": False,
+            "payment_advance": 0,
+            "outstanding_payment": 0,
+            "requested_books": [
+                {"idBook": book.pk, "additives": additive_ids, "quantity": 2, "discount": 10, "base_price": 12}
+                for book in books
+            ],
+        }
+
+    def test_creates_books_and_additives_in_bulk(self):
+        books = [
+            Book.objects.create(title=f"Libro {i}", author="Autor", number_pages=200,
+                                printing_format="normal", color_pages=0)
+            for i in range(30)
+        ]
+        payload = self._payload(books, [a.pk for a in self.additives])
+        response = self.api.post("/api/orders/create_full_order/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["requested_books"]), 30)
+
+        order = Order.objects.get(pk=response.json()["order"]["idOrder"])
+        self.assertEqual(Book_on_order.objects.filter(idOrder=order, quantity=2, base_price=12).count(), 30)
+        self.assertEqual(Requested_book_additive.objects.filter(additive_price=3).count(), 30)
+
+    def test_string_ids_are_accepted(self):
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                   printing_format="normal", color_pages=0)
+        payload = self._payload([book], [str(self.additives[0].pk)])
+        payload["requested_books"][0]["idBook"] = str(book.pk)
+        response = self.api.post("/api/orders/create_full_order/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Requested_book_additive.objects.get().idAdditive, self.additives[0])
+
+        payload["requested_books"][0]["idBook"] = "uno"
+        response = self.api.post("/api/orders/create_full_order/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Libro inválido", response.json()["detail"])
+
+    def test_unknown_additive_rolls_back(self):
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                   printing_format="normal", color_pages=0)
+        response = self.api.post("/api/orders/create_full_order/", self._payload([book], [999]), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Requested_book.objects.exists())
+
+
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.client_obj = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        self.delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                        printing_format="normal", color_pages=0)
+        self.additive = Additive.objects.create(name="Carátula dura", price=3)
+
+    def _row(self, **overrides):
+        row = {
+            "idClient": self.client_obj.pk,
+            "idDelivery": self.delivery.pk,
+            "order_date": "2025-11-03",
+            "delivery_date": "2025-12-03",
+            "total_price": 30,
+            "payment_advance": 10,
+            "pay_method": "Efectivo",
+            "requested_books": [{"idBook": self.book.pk, "additives": [self.additive.pk], "quantity": 2}],
+        }
+        row.update(overrides)
+        return row
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        rows = [self._row(), self._row(idClient=999), self._row(order_date="03/11/2025"), self._row()]
+        response = self.api.post("/api/orders/bulk_import/", rows, format="json")
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual(len(report["created"]), 2)
+        self.assertEqual([e["row"] for e in report["errors"]], [1, 2])
+        self.assertEqual(Order.objects.get(pk=report["created"][0]).outstanding_payment, 20)
+        self.assertEqual(Book_on_order.objects.filter(quantity=2).count(), 2)
+        self.assertEqual(Requested_book_additive.objects.count(), 2)
+
+    def test_csv_rows_are_grouped_by_order_ref(self):
+        c, d, b, a = self.client_obj.pk, self.delivery.pk, self.book.pk, self.additive.pk
+        text = (
+            "order_ref,idClient,idDelivery,order_date,delivery_date,total_price,pay_method,idBook,additives,quantity\n"
+            f"A,{c},{d},2025-11-03,2025-12-03,30,Efectivo,{b},{a},1\n"
+            f"A,,,,,,,{b},,3\n"
+            f"B,{c},{d},2025-11-04,2025-12-04,15,Transferencia,{b},,1\n"
+        )
+        report = import_orders(rows_from_csv(text))
+        self.assertEqual(report["errors"], [])
+        first = Order.objects.get(pk=report["created"][0])
+        self.assertEqual(sorted(first.book_on_order_set.values_list("quantity", flat=True)), [1, 3])
+
+    def test_model_constraints_and_insert_failures_are_per_row(self):
+        from . import order_import
+        original = order_import.bulk_create_order_books
+
+        def failing(orders_books):
+            if any(order.pay_method == "Falla" for order, _ in orders_books):
+                raise ValueError("fallo simulado")
+            return original(orders_books)
+
+        rows = [self._row(), self._row(pay_method="x" * 101), self._row(pay_method="Falla"), self._row()]
+        with mock.patch.object(order_import, "bulk_create_order_books", side_effect=failing):
+            report = import_orders(rows)
+        self.assertEqual(len(report["created"]), 2)
+        self.assertEqual([e["row"] for e in report["errors"]], [1, 2])
+        self.assertIn("pay_method", report["errors"][0]["errors"])
+        self.assertIn("fallo simulado", report["errors"][1]["errors"]["row"])
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_payload_shape_is_validated_up_front(self):
+        upload = SimpleUploadedFile("orders.json", json.dumps({"idClient": 1}).encode())
+        response = self.api.post("/api/orders/bulk_import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Se esperaba una lista de órdenes"})
+
+        response = self.api.post("/api/orders/bulk_import/", {"orders": [self._row()]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        response = self.api.post("/api/orders/bulk_import/", [], format="json")
+        self.assertEqual((response.status_code, response.json()), (200, {"created": [], "errors": []}))
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                   printing_format="normal", color_pages=0)
+        today = timezone.now().date()
+        self.today = today
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(client, delivery, [book], [], order_date=today)
+            create_order(client, delivery, [book], [], order_date=today)
+            create_order(client, delivery, [book], [], order_date=today.replace(day=1) - timedelta(days=1))
+
+    def test_main_stats_counts_current_month(self):
+        data = self.api.get("/api/dashboard/main_stats/").json()
+        self.assertEqual(data["total_orders"], 3)
+        self.assertEqual(data["month_orders"], 2)
+        self.assertEqual(data["month_income"], 200)
+
+    def test_monthly_chart_groups_by_day(self):
+        chart = self.api.get("/api/dashboard/monthly_orders_chart/").json()["chart_data"]
+        self.assertEqual(chart[0]["day"], 1)
+        self.assertEqual(chart[self.today.day - 1], {
+            "date": self.today.strftime("%Y-%m-%d"), "orders": 2, "day": self.today.day
+        })
+        self.assertEqual(sum(point["orders"] for point in chart), 2)
+
+    def test_top_books_month(self):
+        data = self.api.get("/api/dashboard/top_books_month/").json()
+        self.assertEqual(data["top_books"], [{"book": "Libro", "orders": 2}])
+
+    def test_responses_are_cached_until_a_write(self):
+        first = self.api.get("/api/dashboard/main_stats/")
+        second = self.api.get("/api/dashboard/main_stats/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.create(name="Luis", phone_number="5556", identity="880202")
+        third = self.api.get("/api/dashboard/main_stats/")
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.json()["total_clients"], 2)
+
+
+class DashboardTimeseriesTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                   printing_format="normal", color_pages=0)
+        create_order(client, delivery, [book, book], [], order_date="2025-01-06")
+        create_order(client, delivery, [book], [], order_date="2025-01-08")
+        create_order(client, delivery, [], [], order_date="2025-03-02")
+
+    def test_weekly_buckets(self):
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/dashboard/timeseries/",
+                                    {"from": "2025-01-01", "to": "2025-01-20", "granularity": "week"})
+        series = response.json()["series"]
+        self.assertEqual([p["period"] for p in series], ["2024-12-30", "2025-01-06", "2025-01-13", "2025-01-20"])
+        self.assertEqual(series[1], {"period": "2025-01-06", "orders": 2, "revenue": 200.0,
+                                     "books": 3, "outstanding": 200.0})
+        self.assertEqual(series[0]["orders"], 0)
+
+    def test_monthly_buckets_and_validation(self):
+        series = self.api.get("/api/dashboard/timeseries/",
+                              {"from": "2025-01-01", "to": "2025-03-31", "granularity": "month"}).json()["series"]
+        self.assertEqual([(p["period"], p["orders"], p["books"]) for p in series],
+                         [("2025-01-01", 2, 3), ("2025-02-01", 0, 0), ("2025-03-01", 1, 0)])
+
+        response = self.api.get("/api/dashboard/timeseries/", {"granularity": "year"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DashboardTopBooksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        hard = Additive.objects.create(name="Carátula dura", price=3)
+        self.first = Book.objects.create(title="Uno", author="Autora", number_pages=200,
+                                         printing_format="normal", color_pages=0)
+        self.second = Book.objects.create(title="Dos", author="Autora", number_pages=200,
+                                          printing_format="grande", color_pages=0)
+        create_order(client, delivery, [self.first, self.first, self.second], [], order_date="2025-05-02")
+        create_order(client, delivery, [self.second], [hard], order_date="2025-05-20")
+        create_order(client, delivery, [self.second, self.second], [], order_date="2024-05-20")
+
+    def _top(self, **params):
+        params = {"window": "custom", "from": "2025-05-01", "to": "2025-05-31", **params}
+        return self.api.get("/api/dashboard/top_books/", params).json()["top"]
+
+    def test_group_by_book_and_limit(self):
+        self.assertEqual(self._top(), [
+            {"label": "Dos", "quantity": 2, "idBook": self.second.pk},
+            {"label": "Uno", "quantity": 2, "idBook": self.first.pk},
+        ])
+        self.assertEqual(len(self._top(limit=1)), 1)
+
+    def test_group_by_format_author_and_cover(self):
+        self.assertEqual(self._top(group_by="format"), [
+            {"label": "grande", "quantity": 2}, {"label": "normal", "quantity": 2}
+        ])
+        self.assertEqual(self._top(group_by="author"), [{"label": "Autora", "quantity": 4}])
+        self.assertEqual(self._top(group_by="cover"), [
+            {"label": "Carátula Regular", "quantity": 3}, {"label": "Carátula dura", "quantity": 1}
+        ])
+
+    def test_cover_is_the_latest_caratula_of_the_line(self):
+        line = Book_on_order.objects.get(idOrder__order_date="2025-05-20")
+        soft = Additive.objects.create(name="Carátula blanda", price=2)
+        Requested_book_additive.objects.create(idRequested_book=line.idRequested_book, idAdditive=soft, additive_price=2)
+        self.assertIn({"label": "Carátula blanda", "quantity": 1}, self._top(group_by="cover"))
+
+    def test_custom_window_requires_an_ordered_range(self):
+        url = "/api/dashboard/top_books/"
+        self.assertEqual(self.api.get(url, {"window": "custom", "from": "2025-05-31", "to": "2025-05-01"}).status_code, 400)
+        self.assertEqual(self.api.get(url, {"window": "custom", "from": "2025-05-01"}).status_code, 400)
+
+
+class CatalogConditionalGetTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                        printing_format="normal", color_pages=0)
+
+    def test_etag_returns_304_until_the_table_changes(self):
+        first = self.api.get("/api/books/")
+        etag = first["ETag"]
+        self.assertEqual(self.api.get("/api/books/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.api.get("/api/books/", {"title": "Lib"})["ETag"], etag)
+
+        Additive.objects.create(name="Marcador", price=1)
+        self.assertEqual(self.api.get("/api/books/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.api.patch("/api/books/update_pages_by_title/", {"title": "Libro", "number_pages": 300}, format="json")
+        response = self.api.get("/api/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["number_pages"], 300)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.client_obj = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        self.delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                        printing_format="normal", color_pages=0)
+
+    def _snapshot(self):
+        return (
+            list(Daily_sales.objects.order_by("day").values_list("day", "orders", "revenue", "books")),
+            list(Monthly_book_sales.objects.order_by("month").values_list("month", "idBook", "quantity")),
+        )
+
+    def test_rollups_follow_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = create_order(self.client_obj, self.delivery, [self.book, self.book], [], order_date="2025-11-03")
+            create_order(self.client_obj, self.delivery, [self.book], [], order_date="2025-11-03")
+        day = Daily_sales.objects.get(day="2025-11-03")
+        self.assertEqual((day.orders, day.revenue, day.books), (2, 200, 3))
+        self.assertEqual(Monthly_book_sales.objects.get(month="2025-11-01").quantity, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.order_date = "2025-12-01"
+            first.save()
+        self.assertEqual(Daily_sales.objects.get(day="2025-11-03").books, 1)
+        self.assertEqual(Monthly_book_sales.objects.get(month="2025-12-01").quantity, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(Daily_sales.objects.filter(day="2025-12-01").exists())
+        self.assertFalse(Monthly_book_sales.objects.filter(month="2025-12-01").exists())
+
+    def test_bulk_created_orders_update_rollups(self):
+        payload = {
+            "idClient": self.client_obj.pk, "idDelivery": self.delivery.pk,
+            "order_date": "2025-11-03", "delivery_date": "2025-12-03", "total_price": 50,
+            "pay_method": "Efectivo", "done": False, "payment_advance": 0, "outstanding_payment": 0,
+            "requested_books": [{"idBook": self.book.pk, "additives": [], "quantity": 4}],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            APIClient().post("/api/orders/create_full_order/", payload, format="json")
+            import_orders([payload])
+        expected = self._snapshot()
+        self.assertEqual(expected[0], [(date(2025, 11, 3), 2, 100.0, 8)])
+
+        rebuild_rollups()
+        self.assertEqual(self._snapshot(), expected)
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.client_obj = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        self.delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                        printing_format="normal", color_pages=0)
+        self.order = create_order(self.client_obj, self.delivery, [self.book], [])
+
+    def test_sync_returns_only_changes_and_tombstones(self):
+        full = self.api.get("/api/sync/").json()
+        self.assertEqual(len(full["changes"]["orders"]), 1)
+        self.assertEqual(len(full["changes"]["books_on_order"]), 1)
+        since = full["server_time"]
+
+        with mock.patch("core.sync.SYNC_OVERLAP", timedelta(0)):
+            empty = self.api.get("/api/sync/", {"since": since}).json()
+        self.assertTrue(all(rows == [] for rows in empty["changes"].values()))
+
+        self.api.patch("/api/books/update_pages_by_title/", {"title": "Libro", "number_pages": 300}, format="json")
+        order_pk = self.order.pk
+        self.order.delete()
+        delta = self.api.get("/api/sync/", {"since": since, "tables": "books,orders,books_on_order"}).json()
+        self.assertEqual(set(delta["changes"]), {"books", "orders", "books_on_order"})
+        self.assertEqual([b["number_pages"] for b in delta["changes"]["books"]], [300])
+        self.assertEqual(delta["changes"]["orders"], [])
+        self.assertEqual(delta["deleted"]["orders"], [order_pk])
+        self.assertEqual(len(delta["deleted"]["books_on_order"]), 1)
+
+    def test_rows_saved_before_server_time_are_resent(self):
+        since = self.api.get("/api/sync/").json()["server_time"]
+        # Guardada antes de `server_time` pero confirmada después
+        Client.objects.filter(pk=self.client_obj.pk).update(
+            name="Ana María", updated_at=parse_datetime(since) - timedelta(seconds=5)
+        )
+        delta = self.api.get("/api/sync/", {"since": since, "tables": "clients"}).json()
+        self.assertEqual([c["name"] for c in delta["changes"]["clients"]], ["Ana María"])
+
+    def test_full_dump_is_paged(self):
+        for i in range(3):
+            Client.objects.create(name=f"Cliente {i}", phone_number=str(i), identity=f"id{i}")
+        params = {"tables": "clients,orders", "page_size": 3}
+        pages = [self.api.get("/api/sync/", params).json()]
+        while pages[-1]["next"]:
+            pages.append(self.api.get("/api/sync/", {**params, "cursor": pages[-1]["next"]}).json())
+        clients = [c["idClient"] for page in pages for c in page["changes"].get("clients", [])]
+        self.assertEqual(clients, sorted(Client.objects.values_list("pk", flat=True)))
+        self.assertEqual(sum(len(page["changes"].get("orders", [])) for page in pages), 1)
+        self.assertEqual({page["server_time"] for page in pages}, {pages[0]["server_time"]})
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.api.get("/api/sync/", {"cursor": "nope:1:x"}).status_code, 400)
+        self.assertEqual(self.api.get("/api/sync/", {"since": "ayer"}).status_code, 400)
+        self.assertEqual(self.api.get("/api/sync/", {"tables": "nope"}).status_code, 400)
+
+
+class UpdateReadyStatusTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        books = [Book.objects.create(title=f"Libro {i}", author="Autor", number_pages=200,
+                                     printing_format="normal", color_pages=0) for i in range(3)]
+        self.order = create_order(client, delivery, books, [])
+        self.rb_ids = list(self.order.book_on_order_set.order_by("id").values_list("idRequested_book_id", flat=True))
+
+    def test_bulk_update_in_constant_queries(self):
+        url = f"/api/orders/{self.order.pk}/update_ready_status/"
+        with self.assertNumQueries(7):
+            response = self.api.patch(url, {"books": {str(i): True for i in self.rb_ids[:2]}}, format="json")
+        self.assertEqual(response.json()["done"], False)
+        self.assertEqual(list(self.order.book_on_order_set.order_by("id").values_list("ready", flat=True)),
+                         [True, True, False])
+
+        response = self.api.patch(url, {"books": [{"idRequested_book": self.rb_ids[2], "ready": True},
+                                                  {"idRequested_book": 999, "ready": True}]}, format="json")
+        self.assertEqual(response.json()["not_found"], [999])
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.done)
+
+
+class MarkAddedToExcelTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        self.orders = [create_order(client, delivery, [], []) for _ in range(3)]
+
+    def test_marks_only_pending_orders_in_one_update(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(added_to_excel=True)
+        ids = [o.pk for o in self.orders[:2]]
+        response = self.api.post("/api/orders/mark_added_to_excel/", {"ids": ids}, format="json")
+        self.assertEqual(response.json()["updated"], [self.orders[1].pk])
+        self.assertEqual(Order.objects.filter(added_to_excel=False).count(), 1)
+
+        self.assertEqual(self.api.post("/api/orders/mark_added_to_excel/", {}, format="json").status_code, 400)
+        self.assertEqual(self.api.post("/api/orders/mark_added_to_excel/", {"ids": ["x"]}, format="json").status_code, 400)
+
+    def test_empty_ids_are_rejected(self):
+        for ids in ([], "", " , ", None):
+            response = self.api.post("/api/orders/mark_added_to_excel/", {"ids": ids}, format="json")
+            self.assertEqual(response.status_code, 400, ids)
+        self.assertFalse(Order.objects.filter(added_to_excel=True).exists())
+
+        self.assertEqual(self.api.get("/api/orders/bulk_full_details/", {"ids": ""}).status_code, 400)
+        self.assertEqual(len(self.api.get("/api/orders/bulk_full_details/").json()), 3)
+
+
+class FieldFilterTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = Client.objects.create(name="Ana", phone_number="5555", identity="900101")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=200,
+                                   printing_format="normal", color_pages=0)
+        additive = Additive.objects.create(name="Carátula Dura", price=3)
+        self.orders = [create_order(client, delivery, [book], [additive], order_date=f"2025-11-0{i}")
+                       for i in range(1, 4)]
+
+    def test_whitelisted_filters(self):
+        order = self.orders[1]
+        links = self.api.get("/api/books_on_order/", {"idOrder": order.pk}).json()
+        self.assertEqual([l["idOrder"] for l in links], [order.pk])
+
+        rb_id = links[0]["idRequested_book"]
+        additives = self.api.get("/api/requested_book_additives/", {"idRequested_book": rb_id}).json()
+        self.assertEqual([a["idAdditive_name"] for a in additives], ["Carátula Dura"])
+
+        ids = f"{self.orders[0].pk},{self.orders[2].pk}"
+        self.assertEqual(len(self.api.get("/api/orders/", {"idOrder__in": ids}).json()), 2)
+        in_range = self.api.get("/api/orders/", {"order_date__range": "2025-11-02,2025-11-03"}).json()
+        self.assertEqual(sorted(o["idOrder"] for o in in_range), [self.orders[1].pk, self.orders[2].pk])
+
+        # Campos fuera de la lista blanca se ignoran; valores inválidos dan 400
+        self.assertEqual(len(self.api.get("/api/orders/", {"address__isnull": "true"}).json()), 3)
+        self.assertEqual(self.api.get("/api/orders/", {"order_date__gte": "ayer"}).status_code, 400)
+
+
+PRODUCTION_COSTS = {
+    "Imprimir una hoja en BN": 10, "Imprimir una hoja en color": 40, "Precio de una hoja": 5,
+    "pliego A3": 60, "flexibado": 20, "repelado": 10, "acetato": 15, "ziplo": 8, "otros costos": 30,
+    "Marcador": 12, "Tarjeta de regalo": 18, "multiplicador": 2.5, "tasa CUP": 100, "tasa MLC": 1.25,
+}
+
+
+class QuoteTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        for product, price in PRODUCTION_COSTS.items():
+            Production_costs.objects.create(product=product, product_price=price)
+        self.book = Book.objects.create(title="Libro", author="Autor", number_pages=400,
+                                        printing_format="normal", color_pages=0)
+        self.cover = Additive.objects.create(name="Carátula dura", price=5)
+        self.service = Additive.objects.create(name="Servicio Express", price=2)
+
+    def test_batch_quotes_in_every_currency(self):
+        # 400 páginas normal: (15 * 100 + 30 + 113) CUP / 100 * 2.5 -> 41 USD
+        response = self.api.post("/api/quotes/", {"items": [
+            {"idBook": self.book.pk},
+            {"idBook": self.book.pk, "additives": [self.cover.pk, self.service.pk], "discount": 10, "quantity": 2},
+            {"number_pages": 40, "color_pages": 0, "printing_format": "grande"},
+            {"idBook": 999},
+        ]}, format="json")
+        data = response.json()
+        self.assertEqual(data["currencies"], ["CUP", "MLC", "USD"])
+        first, second, third = data["results"]
+        self.assertEqual(first["base_price"], 41)
+        self.assertEqual(first["unit_price"], {"CUP": 4100, "MLC": 51.25, "USD": 41})
+        self.assertEqual(second["total"]["USD"], round(((41 + 5) * 0.9 + 2) * 2, 2))
+        self.assertEqual(third["base_price"], 9)
+        self.assertEqual(data["errors"], [{"item": 3, "error": "Libro 999 no existe."}])
+
+    def test_malformed_items_are_rejected(self):
+        response = self.api.post("/api/quotes/", {"items": [{"idBook": str(self.book.pk)}]}, format="json")
+        self.assertEqual(response.json()["results"][0]["base_price"], 41)
+        for item in ({"idBook": [self.book.pk]}, {"additives": {"a": [1]}}, "libro", {}, {"idBook": None},
+                     {"number_pages": 40}, {"printing_format": "grande"}, {"number_pages": 40, "printing_format": ""}):
+            response = self.api.post("/api/quotes/", {"items": [item]}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.api.post("/api/quotes/", {"items": [], "currencies": 5}, format="json").status_code, 400)
+
+    def test_cost_changes_refresh_cached_tables(self):
+        item = {"items": [{"idBook": self.book.pk}], "currencies": ["USD"]}
+        self.assertEqual(self.api.post("/api/quotes/", item, format="json").json()["results"][0]["base_price"], 41)
+        Production_costs.objects.filter(product="multiplicador").get().delete()
+        Production_costs.objects.create(product="multiplicador", product_price=5)
+        with self.assertNumQueries(3):
+            response = self.api.post("/api/quotes/", item, format="json")
+        self.assertEqual(response.json()["results"][0]["base_price"], 82)
+        with self.assertNumQueries(2):
+            self.api.post("/api/quotes/", item, format="json")
+
+
+class BookPriceTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            for product, price in PRODUCTION_COSTS.items():
+                Production_costs.objects.create(product=product, product_price=price)
+            self.book = Book.objects.create(title="Libro", author="Autor", number_pages=400,
+                                            printing_format="normal", color_pages=0)
+            self.cover = Additive.objects.create(name="Carátula dura (normal)", price=5)
+
+    def test_prices_follow_costs_additives_and_pages(self):
+        prices = self.api.get(f"/api/books/{self.book.pk}/prices/").json()["prices"]
+        self.assertEqual(prices["normal"]["Normal"], {"CUP": 4100, "MLC": 51.25, "USD": 41})
+        self.assertEqual(prices["normal"]["Carátula dura"]["USD"], 46)
+        self.assertNotIn("Carátula dura", prices["grande"])
+
+        etag = self.api.get("/api/books/prices/", {"ids": self.book.pk})["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cover.price = 7
+            self.cover.save()
+        response = self.api.get("/api/books/prices/", {"ids": self.book.pk, "currency": "USD"},
+                                HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()[str(self.book.pk)]["normal"]["Carátula dura"], {"USD": 48})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.patch("/api/books/update_pages_by_title/", {"title": "Libro", "number_pages": 800}, format="json")
+        usd = Book_price.objects.get(idBook=self.book, printing_format="normal", cover="Normal", currency="USD")
+        self.assertEqual(usd.price, 79)
+
+    def test_changes_only_rebuild_the_rows_they_affect(self):
+        grande = set(Book_price.objects.filter(printing_format="grande").values_list("pk", flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cover.name = "Carátula blanda (normal)"
+            self.cover.save()
+            Additive.objects.create(name="Servicio Express", price=2)
+            ziplo = Production_costs.objects.get(product="ziplo")
+            ziplo.product_price = 400
+            ziplo.save()
+            Production_costs.objects.filter(product="tasa MLC").get().delete()
+        self.assertTrue(grande >= set(Book_price.objects.filter(printing_format="grande", currency="USD")
+                                      .values_list("pk", flat=True)))
+        self.assertFalse(Book_price.objects.filter(cover="Carátula dura").exists())
+
+        columns = ("idBook", "printing_format", "cover", "currency", "price")
+        partial = set(Book_price.objects.values_list(*columns))
+        refresh_book_prices()
+        self.assertEqual(partial, set(Book_price.objects.values_list(*columns)))
+
+    def test_rate_rows_with_long_currency_codes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Production_costs.objects.create(product="tasa USDT", product_price=1.1)
+        prices = self.api.get(f"/api/books/{self.book.pk}/prices/").json()["prices"]
+        self.assertEqual(prices["normal"]["Normal"]["USDT"], 45.1)
+        self.assertGreaterEqual(Book_price._meta.get_field("currency").max_length,
+                                Production_costs._meta.get_field("product").max_length - len("tasa "))
+
+
+class MarginAnalysisTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        for product, price in PRODUCTION_COSTS.items():
+            Production_costs.objects.create(product=product, product_price=price)
+        Production_costs_history.objects.update(changed_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        client = Client.objects.create(name="Ana", phone_number="555", identity="123")
+        delivery = Delivery.objects.create(zone="Centro", price=5, description="")
+        book = Book.objects.create(title="Libro", author="Autor", number_pages=400,
+                                   printing_format="normal", color_pages=0)
+        cover = Additive.objects.create(name="Carátula dura (normal)", price=5)
+        create_order(client, delivery, [book], [cover], order_date="2025-11-03")
+        self.today = timezone.now().date()
+        pliego = Production_costs.objects.get(product="pliego A3")
+        pliego.product_price = 160
+        pliego.save()
+        create_order(client, delivery, [book], [cover], order_date=self.today.isoformat())
+
+    def test_costs_in_effect_at_each_order_date(self):
+        response = self.api.get("/api/dashboard/margins/", {"group_by": "month,cover"})
+        data = response.json()
+        months = {row["month"]: row for row in data["month"]}
+        # (15 * 100 + 30 + 113) CUP / 100 y luego con el pliego A3 a 160
+        self.assertEqual(months["2025-11"]["cost"], 16.43)
+        self.assertEqual(months[self.today.strftime("%Y-%m")]["cost"], 16.93)
+        self.assertEqual(months["2025-11"]["revenue"], 15)
+        self.assertEqual(months["2025-11"]["margin"], -1.43)
+        self.assertEqual(months["2025-11"]["billed"], 100)
+        self.assertEqual(data["cover"], [{"cover": "Carátula dura", "items": 2, "revenue": 30.0, "cost": 33.36,
+                                          "margin": -3.36, "margin_pct": -11.2}])
+        self.assertEqual(data["missing_costs"], 0)
+        self.assertEqual(self.api.get("/api/dashboard/margins/", {"group_by": "cliente"}).status_code, 400)
+
+    def test_additive_lines_invalidate_the_cached_analysis(self):
+        params = {"group_by": "cover"}
+        self.assertEqual(self.api.get("/api/dashboard/margins/", params)["X-Cache"], "MISS")
+        self.assertEqual(self.api.get("/api/dashboard/margins/", params)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            Requested_book_additive.objects.first().delete()
+        response = self.api.get("/api/dashboard/margins/", params)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["cover"][0]["items"], 1)
@@ -2,7 +2,8 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import (ClientViewSet, DeliveryViewSet, BookViewSet, AdditiveViewSet, RequestedBookViewSet, 
-OrderViewSet, BookOnOrderViewSet, RequestedBookAdditiveViewSet, DashboardStatsViewSet, ProductionCostsViewSet)
+OrderViewSet, BookOnOrderViewSet, RequestedBookAdditiveViewSet, DashboardStatsViewSet, ProductionCostsViewSet, SyncViewSet,
+QuoteViewSet)
 
 router = routers.DefaultRouter()
 router.register(r'clients', ClientViewSet, basename='client')
@@ -15,6 +16,8 @@ router.register(r'books_on_order', BookOnOrderViewSet)
 router.register(r'requested_book_additives', RequestedBookAdditiveViewSet) 
 router.register(r'dashboard', DashboardStatsViewSet, basename='dashboard')
 router.register(r'production_costs', ProductionCostsViewSet, basename='production_costs')
+router.register(r'sync', SyncViewSet, basename='sync')
+router.register(r'quotes', QuoteViewSet, basename='quote')
 
 urlpatterns = router.urls
 
@@ -1,13 +1,26 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Client, Delivery, Book, Additive, Requested_book, Book_on_order, Order, Requested_book_additive, Production_costs 
-from .serializers import ClientSerializer, DeliverySerializer, BookSerializer, AdditiveSerializer, RequestedBookSerializer, BookOnOrderSerializer, OrderSerializer, RequestedBookAdditiveSerializer, ProductionCostsSerializer
+from rest_framework.generics import get_object_or_404
+from .models import Client, Delivery, Book, Additive, Requested_book, Book_on_order, Order, Requested_book_additive, Production_costs, Daily_sales, Monthly_book_sales, Book_price
+from .serializers import ClientSerializer, DeliverySerializer, BookSerializer, AdditiveSerializer, RequestedBookSerializer, BookOnOrderSerializer, OrderSerializer, RequestedBookAdditiveSerializer, ProductionCostsSerializer, QuoteSerializer
+from .order_details import full_details_queryset, build_order_details
+from .order_creation import bulk_create_order_books
+from .order_import import import_orders, orders_from_data, rows_from_csv, to_bool
+from .dashboard_cache import cached_dashboard_response
+from .conditional import ConditionalGetMixin, bump_table_version
+from .book_prices import mark_book_prices_dirty
+from .sync import SYNC_TABLES, SYNC_PAGE_SIZE, MAX_SYNC_PAGE_SIZE, collect_changes
+from .pricing import (BASE_CURRENCY, PricingError, get_pricing_tables, book_base_price, quote_book,
+                      convert)
+from .margins import MarginAnalysisError, margin_analysis, GROUPS as MARGIN_GROUPS
 from django.db import transaction
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, F, Count, Sum, Value, Prefetch, OuterRef, Subquery, IntegerField, BooleanField, Case, When
+from django.db.models.functions import Trim, Coalesce, TruncDay, TruncWeek, TruncMonth
 from datetime import datetime, timedelta, date
 from django.utils import timezone
-from collections import Counter
+from django.utils.dateparse import parse_datetime
+import json
 
 
 #? ----------------------------
@@ -16,15 +29,21 @@ from collections import Counter
 class ClientViewSet(viewsets.ModelViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
+    cursor_ordering_fields = ('name', 'identity')
+    filter_fields = {'idClient': ('exact', 'in'), 'phone_number': ('exact',)}
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         name = request.query_params.get('name')
         identity = request.query_params.get('identity')
         if name:
             qs = qs.filter(name__icontains=name)
         if identity:
             qs = qs.filter(identity__iexact=identity)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -38,22 +57,51 @@ class ClientViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        clients = Client.objects.filter(
-            Q(name__icontains=query) |
-            Q(identity__icontains=query) |
-            Q(phone_number__icontains=query)
-        ).distinct()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({"error": "Los parámetros 'limit' y 'offset' deben ser enteros"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        if not clients.exists():
-            return Response({"clients": []}, status=status.HTTP_200_OK)
+        orders_prefetch = Prefetch(
+            'order_set',
+            queryset=Order.objects.select_related('idDelivery').order_by('idOrder'),
+            to_attr='prefetched_orders'
+        )
+        clients = list(
+            Client.objects.filter(
+                Q(name__icontains=query) |
+                Q(identity__icontains=query) |
+                Q(phone_number__icontains=query)
+            )
+            .annotate(total_orders=Count('order'))
+            .order_by('name', 'idClient')
+            .prefetch_related(orders_prefetch)[offset:offset + limit + 1]
+        )
+        has_more = len(clients) > limit
+        clients = clients[:limit]
+
+        if not clients:
+            return Response({"clients": [], "has_more": False}, status=status.HTTP_200_OK)
+
+        addresses = {}
+        address_rows = (
+            Order.objects
+            .filter(idClient__in=[client.idClient for client in clients])
+            .annotate(clean_address=Trim('address'))
+            .exclude(clean_address__isnull=True)
+            .exclude(clean_address='')
+            .values_list('idClient', 'clean_address')
+            .distinct()
+        )
+        for client_id, address in address_rows:
+            addresses.setdefault(client_id, []).append(address)
 
         result = []
         for client in clients:
-            orders = Order.objects.filter(idClient=client).select_related('idDelivery')
-            
-            orders_data = []
-            for order in orders:
-                orders_data.append({
+            orders_data = [
+                {
                     'idOrder': order.idOrder,
                     '_type': order._type,
                     'address': order.address,
@@ -64,33 +112,31 @@ class ClientViewSet(viewsets.ModelViewSet):
                     'total_price': order.total_price,
                     'pay_method': order.pay_method,
                     'done': order.done
-                })
+                }
+                for order in client.prefetched_orders
+            ]
 
-            unique_addresses = set()
-            for order in orders:
-                if order.address and order.address.strip():
-                    unique_addresses.add(order.address.strip())
-            
-            client_data = {
+            result.append({
                 'idClient': client.idClient,
                 'name': client.name,
                 'phone_number': client.phone_number,
                 'identity': client.identity,
-                'total_orders': orders.count(),
-                'unique_addresses': list(unique_addresses),
+                'total_orders': client.total_orders,
+                'unique_addresses': addresses.get(client.idClient, []),
                 'orders': orders_data
-            }
-            
-            result.append(client_data)
+            })
 
-        return Response({"clients": result}, status=status.HTTP_200_OK)
+        return Response({"clients": result, "has_more": has_more}, status=status.HTTP_200_OK)
 
 #? ----------------------------
 #? DeliveryViewSet
 #? ----------------------------
-class DeliveryViewSet(viewsets.ModelViewSet):
+class DeliveryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Delivery.objects.all()
+    version_tables = (Delivery._meta.db_table,)
     serializer_class = DeliverySerializer
+    cursor_ordering_fields = ('zone', 'price')
+    filter_fields = {'idDelivery': ('exact', 'in'), 'price': ('range',)}
 
     def create(self, request, *args, **kwargs):
         zone = request.data.get("zone")
@@ -113,10 +159,14 @@ class DeliveryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         zone = request.query_params.get('zone')
         if zone:
             qs = qs.filter(zone__icontains=zone)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -142,25 +192,33 @@ class DeliveryViewSet(viewsets.ModelViewSet):
             return Response({'Error': 'El precio debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
 
         qs = self.get_queryset().filter(zone__iexact=zone)
-        updated = qs.update(price=price)
+        updated = qs.update(price=price, updated_at=timezone.now())
+        bump_table_version(Delivery._meta.db_table)
         serializer = self.get_serializer(qs, many=True)
         return Response({'Actualizado': updated, 'objects': serializer.data})
 
 #? ----------------------------
 #? BookViewSet
 #? ----------------------------
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
+    version_tables = (Book._meta.db_table, Book_price._meta.db_table)
     serializer_class = BookSerializer
+    cursor_ordering_fields = ('title', 'author', 'number_pages')
+    filter_fields = {'idBook': ('exact', 'in'), 'number_pages': ('exact', 'range'), 'printing_format': ('exact',), 'color_pages': ('range',)}
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         title = request.query_params.get('title')
         author = request.query_params.get('author')
         if title:
               qs = qs.filter(title__icontains=title)
         if author:
              qs = qs.filter(author__icontains=author)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -195,7 +253,10 @@ class BookViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({'Error': 'El número de páginas debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
         qs = self.get_queryset().filter(title__icontains=title)
-        updated = qs.update(number_pages=pages)
+        book_ids = list(qs.values_list('idBook', flat=True))
+        updated = qs.update(number_pages=pages, updated_at=timezone.now())
+        bump_table_version(Book._meta.db_table)
+        mark_book_prices_dirty(book_ids)
         serializer = self.get_serializer(qs, many=True)
         return Response({'Libro actualizado': updated, 'objects': serializer.data})
         
@@ -211,6 +272,35 @@ class BookViewSet(viewsets.ModelViewSet):
         book = qs.first()
         return Response({'title': book.title, 'author': book.author, 'price': book.number_pages})
     
+    # Precios precalculados en Book_price: {idBook: {formato: {carátula: {moneda: precio}}}}
+    def _book_prices(self, request, book_ids):
+        qs = Book_price.objects.filter(idBook_id__in=book_ids)
+        for field in ('printing_format', 'currency'):
+            value = request.query_params.get(field)
+            if value:
+                qs = qs.filter(**{field: value})
+        prices = {}
+        for book_id, printing_format, cover, currency, price in qs.values_list(
+                'idBook_id', 'printing_format', 'cover', 'currency', 'price').order_by('idBook_id', 'printing_format', 'cover'):
+            prices.setdefault(book_id, {}).setdefault(printing_format, {}).setdefault(cover, {})[currency] = price
+        return prices
+
+    @action(detail=True, methods=['get'], url_path='prices')
+    def prices(self, request, pk=None):
+        book = get_object_or_404(Book.objects.only('idBook'), pk=pk)
+        return Response({'idBook': book.pk, 'prices': self._book_prices(request, [book.pk]).get(book.pk, {})})
+
+    @action(detail=False, methods=['get'], url_path='prices')
+    def bulk_prices(self, request):
+        try:
+            ids = [int(i) for i in request.query_params.get('ids', '').split(',') if i.strip()]
+        except ValueError:
+            return Response({'Error': "El parámetro 'ids' debe ser una lista de enteros separados por coma"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'Error': "El parámetro 'ids' es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self._book_prices(request, ids))
+
     @action(detail=False, methods=['get'], url_path='search_titles')
     def search_titles(self, request):
         query = request.query_params.get('query')
@@ -225,15 +315,22 @@ class BookViewSet(viewsets.ModelViewSet):
 #? ----------------------------
 #? AdditiveViewSet
 #? ----------------------------
-class AdditiveViewSet(viewsets.ModelViewSet):
+class AdditiveViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Additive.objects.all()
+    version_tables = (Additive._meta.db_table,)
     serializer_class = AdditiveSerializer
+    cursor_ordering_fields = ('name', 'price')
+    filter_fields = {'idAdditive': ('exact', 'in'), 'price': ('range',)}
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         name = request.query_params.get('name')
         if name:
             qs = qs.filter(name__icontains=name)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -264,50 +361,53 @@ class AdditiveViewSet(viewsets.ModelViewSet):
 class RequestedBookViewSet(viewsets.ModelViewSet):
     queryset = Requested_book.objects.all()
     serializer_class = RequestedBookSerializer
+    filter_fields = {'idRequested_book': ('exact', 'in'), 'idBook': ('exact', 'in')}
+
+
+# Filtros compartidos por bulk_full_details y mark_added_to_excel:
+# `ids` (lista o "1,2,3"), `added_to_excel` y `done`.
+def _filter_orders(orders, params):
+    # Solo la ausencia de 'ids' significa "sin filtro"; vacío es un error
+    if 'ids' in params:
+        ids = params.get('ids') or []
+        if isinstance(ids, str):
+            ids = ids.split(',')
+        ids = [int(i) for i in ids if str(i).strip()]
+        if not ids:
+            raise ValueError('ids vacío')
+        orders = orders.filter(idOrder__in=ids)
+
+    for field in ('added_to_excel', 'done'):
+        value = params.get(field)
+        if value is not None:
+            orders = orders.filter(**{field: to_bool(value)})
+    return orders
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all().select_related('idClient', 'idDelivery').prefetch_related('Requested_book__idBook')
     serializer_class = OrderSerializer
+    cursor_ordering_fields = ('order_date', 'delivery_date', 'total_price')
+    filter_fields = {
+        'idOrder': ('exact', 'in'), 'idClient': ('exact', 'in'), 'idDelivery': ('exact', 'in'),
+        '_type': ('exact',), 'pay_method': ('exact',), 'done': ('exact',), 'added_to_excel': ('exact',),
+        'order_date': ('exact', 'range'), 'delivery_date': ('exact', 'range'), 'total_price': ('range',),
+    }
 
     @transaction.atomic
     @action(detail=False, methods=['post'], url_path='create_full_order')
     def create_full_order(self, request):
         data = request.data
+        order_data = {k: v for k, v in data.items() if k != "requested_books"}
 
-        order_serializer = self.get_serializer(data=data)
+        order_serializer = self.get_serializer(data=order_data)
         order_serializer.is_valid(raise_exception=True)
         order = order_serializer.save()
 
         requested_books_data = data.get("requested_books", [])
-        created_requested_books = []
 
         try:
-            for rb in requested_books_data:
-                requested_book_serializer = RequestedBookSerializer(
-                    data={"idBook": rb["idBook"]}
-                )
-                requested_book_serializer.is_valid(raise_exception=True)
-                requested_book = requested_book_serializer.save()
-
-                for add_id in rb.get("additives", []):
-                    additive_obj = Additive.objects.get(pk=add_id)
-                    additive_price = additive_obj.price
-                    Requested_book_additive.objects.create(
-                        idRequested_book=requested_book,
-                        idAdditive=additive_obj,
-                        additive_price=additive_price
-                    )
-
-                Book_on_order.objects.create(
-                    idRequested_book=requested_book,
-                    idOrder=order,
-                    discount=rb.get("discount", 0),
-                    ready=rb.get("ready", False),
-                    quantity=rb.get("quantity", 1),
-                    base_price=rb.get("base_price", 0)
-                )
-
-                created_requested_books.append(requested_book.idRequested_book)
+            requested_books = bulk_create_order_books([(order, requested_books_data)])
         except Exception as e:
             transaction.set_rollback(True)
             return Response(
@@ -317,9 +417,36 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         return Response({
             "order": order_serializer.data,
-            "requested_books": created_requested_books,
+            "requested_books": [rb.idRequested_book for rb in requested_books],
         }, status=status.HTTP_201_CREATED)
     
+    @action(detail=False, methods=['post'], url_path='bulk_import')
+    def bulk_import(self, request):
+        upload = request.FILES.get('file')
+        try:
+            if upload:
+                text = upload.read().decode('utf-8-sig')
+                rows = rows_from_csv(text) if upload.name.lower().endswith('.csv') else json.loads(text)
+            else:
+                rows = request.data
+        except (UnicodeDecodeError, ValueError) as e:
+            return Response({"error": f"Archivo inválido: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = orders_from_data(rows)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Sin filas no hay nada que importar, como en el comando import_orders
+        report = import_orders(rows)
+        if report['created']:
+            response_status = status.HTTP_201_CREATED
+        elif report['errors']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report, status=response_status)
+
     @transaction.atomic
     @action(detail=True, methods=['delete'], url_path='delete_full_order')
     def delete_full_order(self, request, pk=None):
@@ -380,77 +507,70 @@ class OrderViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='full_details')
     def get_full_details(self, request, pk=None):
         try:
-            order = self.get_queryset().get(pk=pk)
+            order = full_details_queryset().get(pk=pk)
         except Order.DoesNotExist:
             return Response({"error": "Orden no encontrada"}, status=status.HTTP_404_NOT_FOUND)
 
-        order_data = {
-            "idOrder": order.idOrder,
-            "_type": order._type,
-            "address": order.address,
-            "order_date": order.order_date,
-            "delivery_date": order.delivery_date,
-            "total_price": order.total_price,
-            "pay_method": order.pay_method,
-            "done": order.done,
-            "payment_advance": order.payment_advance,
-            "outstanding_payment": order.outstanding_payment,
-            "added_to_excel": order.added_to_excel,
-            "delivery_zone": order.idDelivery.zone if order.idDelivery else None,
-            "delivery_price": order.idDelivery.price if order.idDelivery else 0,
-            "discount": order.discount,
-            "client": {
-                "idClient": order.idClient.idClient,
-                "name": order.idClient.name,
-                "phone_number": order.idClient.phone_number,
-                "identity": order.idClient.identity,
-            },
-            "books": []
-        }
-
-        book_links = (
-            Book_on_order.objects
-            .filter(idOrder=order)
-            .select_related('idRequested_book__idBook')
-        )
+        return Response(build_order_details(order), status=status.HTTP_200_OK)
 
-        for link in book_links:
-            requested_book = link.idRequested_book
-            book = requested_book.idBook
+    @action(detail=False, methods=['get'], url_path='bulk_full_details')
+    def bulk_full_details(self, request):
+        try:
+            orders = _filter_orders(full_details_queryset().order_by('idOrder'), request.query_params)
+        except ValueError:
+            return Response({"error": "El parámetro 'ids' debe ser una lista de enteros separados por coma"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        result = [build_order_details(order) for order in orders]
+        return Response(result, status=status.HTTP_200_OK)
+
+    # Marca como exportadas al Excel las órdenes de `ids` (o las que cumplan
+    # `done`) con un solo UPDATE y devuelve los ids que cambiaron.
+    @action(detail=False, methods=['post'], url_path='mark_added_to_excel')
+    def mark_added_to_excel(self, request):
+        params = {k: request.data[k] for k in ('ids', 'done') if k in request.data}
+        if not params:
+            return Response({"error": "Se requiere 'ids' o un filtro"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            orders = _filter_orders(Order.objects.filter(added_to_excel=False), params)
+        except (TypeError, ValueError):
+            return Response({"error": "El parámetro 'ids' debe ser una lista de enteros"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            ids = list(orders.select_for_update().order_by('idOrder').values_list('idOrder', flat=True))
+            if ids:
+                Order.objects.filter(idOrder__in=ids).update(added_to_excel=True, updated_at=timezone.now())
+        return Response({"updated": ids})
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "El parámetro 'q' es requerido"}, status=status.HTTP_400_BAD_REQUEST)
 
-            additives = (
-                Requested_book_additive.objects
-                .filter(idRequested_book=requested_book)
-                .select_related('idAdditive')
-            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+        except ValueError:
+            return Response({"error": "El parámetro 'limit' debe ser un entero"}, status=status.HTTP_400_BAD_REQUEST)
 
-            additives_data = [
-                {
-                    "idAdditive": add.idAdditive.idAdditive,
-                    "name": add.idAdditive.name,
-                    "price": add.additive_price
-                }
-                for add in additives
-            ]
+        client_ids = Client.objects.filter(
+            Q(name__icontains=query) |
+            Q(identity__icontains=query) |
+            Q(phone_number__icontains=query)
+        ).values('idClient')
 
-            order_data["books"].append({
-                "idRequested_book": requested_book.idRequested_book,
-                "book": {
-                    "idBook": book.idBook,
-                    "title": book.title,
-                    "author": book.author,
-                    "number_pages": book.number_pages,
-                    "printing_format": book.printing_format,
-                    "color_pages": book.color_pages
-                },
-                "additives": additives_data,
-                "discount": link.discount,
-                "ready": link.ready,
-                "quantity": link.quantity,
-                "base_price": link.base_price
-            })
+        condition = Q(idClient__in=client_ids)
+        if query.isdecimal() and query.isascii():
+            condition |= Q(idOrder=int(query))
 
-        return Response(order_data, status=status.HTTP_200_OK)
+        orders = list(
+            Order.objects.filter(condition)
+            .select_related('idClient', 'idDelivery')
+            .order_by('-idOrder')[:limit + 1]
+        )
+        serializer = self.get_serializer(orders[:limit], many=True)
+        return Response({"results": serializer.data, "has_more": len(orders) > limit})
 
 
     @transaction.atomic
@@ -525,36 +645,50 @@ class OrderViewSet(viewsets.ModelViewSet):
         else:
             fecha_entrega = today + timedelta(days=30)
 
-        order.delivery_date = fecha_entrega.strftime("%Y-%m-%d")
+        order.delivery_date = fecha_entrega
         order.save()
 
 
 
     @transaction.atomic
+    # Marca los libros de la orden con un solo UPDATE ... CASE y recalcula
+    # `done` en la misma transacción. `books` puede ser {"<idRequested_book>": true}
+    # o la lista [{"idRequested_book": 1, "ready": true}, ...].
     @action(detail=True, methods=['patch'], url_path='update_ready_status')
     def update_ready_status(self, request, pk=None):
-        try:
-            order = self.get_object()
-        except Order.DoesNotExist:
-            return Response({"error": "Orden no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+        order = get_object_or_404(Order.objects.only('idOrder'), pk=pk)
         books_data = request.data.get("books", [])
-        if not isinstance(books_data, list):
+        if isinstance(books_data, dict):
+            pairs = books_data.items()
+        elif isinstance(books_data, list):
+            pairs = [(b.get("idRequested_book"), b.get("ready", False)) for b in books_data if isinstance(b, dict)]
+        else:
             return Response({"error": "Formato inválido para 'books'."}, status=status.HTTP_400_BAD_REQUEST)
-        for b in books_data:
-            book_id = b.get("idRequested_book")
-            ready_status = b.get("ready", False)
-            try:
-                link = Book_on_order.objects.get(idRequested_book_id=book_id, idOrder=order)
-                link.ready = ready_status
-                link.save()
-            except Book_on_order.DoesNotExist:
-                continue
-
-        all_ready = not Book_on_order.objects.filter(idOrder=order, ready=False).exists()
-        order.done = all_ready
-        order.save()
+        try:
+            states = {int(book_id): to_bool(ready) for book_id, ready in pairs}
+        except (TypeError, ValueError):
+            return Response({"error": "Identificadores de libro inválidos."}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        links = Book_on_order.objects.filter(idOrder=order)
+        found = set(links.filter(idRequested_book_id__in=states).values_list('idRequested_book_id', flat=True))
+        if found:
+            links.filter(idRequested_book_id__in=found).update(
+                ready=Case(
+                    *[When(idRequested_book_id=book_id, then=Value(states[book_id])) for book_id in found],
+                    output_field=BooleanField()
+                ),
+                updated_at=now
+            )
+        done = not links.filter(ready=False).exists()
+        Order.objects.filter(pk=order.pk).update(done=done, updated_at=now)
 
-        return Response({"detail": "Estados actualizados correctamente", "done": order.done})
+        return Response({
+            "detail": "Estados actualizados correctamente",
+            "done": done,
+            "updated": len(found),
+            "not_found": sorted(set(states) - found)
+        })
     
     def _update_order_type_additives(self, order: Order, new_type: str):
         current_type_lower = order._type.lower()
@@ -598,13 +732,15 @@ class OrderViewSet(viewsets.ModelViewSet):
 class BookOnOrderViewSet(viewsets.ModelViewSet):
     queryset = Book_on_order.objects.all().select_related('idRequested_book__idBook', 'idOrder')
     serializer_class = BookOnOrderSerializer
+    filter_fields = {'id': ('exact', 'in'), 'idOrder': ('exact', 'in'), 'idRequested_book': ('exact', 'in'), 'ready': ('exact',)}
 
 class RequestedBookAdditiveViewSet(viewsets.ModelViewSet):
     queryset = Requested_book_additive.objects.select_related('idRequested_book__idBook', 'idAdditive').all()
     serializer_class = RequestedBookAdditiveSerializer
+    filter_fields = {'id': ('exact', 'in'), 'idRequested_book': ('exact', 'in'), 'idAdditive': ('exact', 'in')}
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         book_title = request.query_params.get('book_title')
         additive_name = request.query_params.get('additive_name')
 
@@ -613,6 +749,10 @@ class RequestedBookAdditiveViewSet(viewsets.ModelViewSet):
         if additive_name:
             qs = qs.filter(idAdditive__name__icontains=additive_name)
 
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -620,29 +760,60 @@ class RequestedBookAdditiveViewSet(viewsets.ModelViewSet):
 #? ----------------------------
 #? Estadísticas Dashboard
 #? ----------------------------
+def _month_range(day):
+    first_day = day.replace(day=1)
+    if first_day.month == 12:
+        next_first_day = first_day.replace(year=first_day.year + 1, month=1)
+    else:
+        next_first_day = first_day.replace(month=first_day.month + 1)
+    return first_day, next_first_day
+
+
+TIMESERIES_TRUNC = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+TOP_BOOKS_GROUPS = {
+    'book': 'idRequested_book__idBook__title',
+    'author': 'idRequested_book__idBook__author',
+    'format': 'idRequested_book__idBook__printing_format',
+    'cover': None,
+}
+
+
+def _bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return _month_range(day)[1]
+    return day + timedelta(days=1)
+
+
 class DashboardStatsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='main_stats')
+    @cached_dashboard_response('main_stats')
     def main_stats(self, request):
         try:
             total_orders = Order.objects.count()
             total_clients = Client.objects.count()
-            total_books_ordered = Book_on_order.objects.aggregate(total=Sum('quantity'))['total'] or 0
-
-            today = timezone.now().date()
-            current_year = today.year
-            current_month = today.month
-            month_str = str(current_month).zfill(2)
+            total_books_ordered = Daily_sales.objects.aggregate(total=Sum('books'))['total'] or 0
 
-            month_orders_qs = Order.objects.filter(order_date__startswith=f"{current_year}-{month_str}")
-            month_orders = month_orders_qs.count()
-            month_income = month_orders_qs.aggregate(total=Sum('total_price'))['total'] or 0
+            first_day, next_first_day = _month_range(timezone.now().date())
+            month_totals = Daily_sales.objects.filter(
+                day__gte=first_day, day__lt=next_first_day
+            ).aggregate(orders=Sum('orders'), income=Sum('revenue'))
 
             return Response({
                 'total_orders': total_orders,
                 'total_clients': total_clients,
-                'month_orders': month_orders,
+                'month_orders': month_totals['orders'] or 0,
                 'total_books_ordered': total_books_ordered,
-                'month_income': round(month_income, 2)
+                'month_income': round(month_totals['income'] or 0, 2)
             })
         except Exception as e:
             return Response(
@@ -651,39 +822,22 @@ class DashboardStatsViewSet(viewsets.ViewSet):
             )
     
     @action(detail=False, methods=['get'], url_path='monthly_orders_chart')
+    @cached_dashboard_response('monthly_orders_chart')
     def monthly_orders_chart(self, request):
         try:
-            today = timezone.now().date()
-            current_year = today.year
-            current_month = today.month
-            month_str = str(current_month).zfill(2)
-            orders = Order.objects.filter(
-                order_date__startswith=f"{current_year}-{month_str}"
-            ).values('order_date')
-
-            daily_counts = {}
-            for order in orders:
-                try:
-                    order_date = datetime.strptime(order['order_date'], '%Y-%m-%d').date()
-                    day_str = order_date.strftime('%Y-%m-%d')
-                    daily_counts[day_str] = daily_counts.get(day_str, 0) + 1
-                except ValueError:
-                    continue
-            
+            first_day, next_first_day = _month_range(timezone.now().date())
+            daily_counts = dict(
+                Daily_sales.objects
+                .filter(day__gte=first_day, day__lt=next_first_day)
+                .values_list('day', 'orders')
+            )
 
-            first_day_month = today.replace(day=1)
-            if today.month == 12:
-                last_day_month = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                last_day_month = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-            
             chart_data = []
-            current_date = first_day_month
-            while current_date <= last_day_month:
-                day_str = current_date.strftime('%Y-%m-%d')
+            current_date = first_day
+            while current_date < next_first_day:
                 chart_data.append({
-                    'date': day_str,
-                    'orders': daily_counts.get(day_str, 0),
+                    'date': current_date.strftime('%Y-%m-%d'),
+                    'orders': daily_counts.get(current_date, 0),
                     'day': current_date.day
                 })
                 current_date += timedelta(days=1)
@@ -696,23 +850,17 @@ class DashboardStatsViewSet(viewsets.ViewSet):
             )
     
     @action(detail=False, methods=['get'], url_path='top_books_month')
+    @cached_dashboard_response('top_books_month')
     def top_books_month(self, request):
         try:
-            today = timezone.now().date()
-            current_year = today.year
-            current_month = today.month
-            month_str = str(current_month).zfill(2)
-            book_orders = Book_on_order.objects.filter(
-                idOrder__order_date__startswith=f"{current_year}-{month_str}"
-            ).select_related('idRequested_book__idBook')
-
-            book_counts = Counter()
-            for book_order in book_orders:
-                book_title = book_order.idRequested_book.idBook.title
-                book_counts[book_title] += book_order.quantity
-
-            top_books = book_counts.most_common(5)
-            result = [{'book': book, 'orders': count} for book, count in top_books]
+            first_day, _ = _month_range(timezone.now().date())
+            top_books = (
+                Monthly_book_sales.objects
+                .filter(month=first_day, quantity__gt=0)
+                .select_related('idBook')
+                .order_by('-quantity', 'idBook__title')[:5]
+            )
+            result = [{'book': row.idBook.title, 'orders': row.quantity} for row in top_books]
             
             return Response({'top_books': result})
         except Exception as e:
@@ -721,15 +869,171 @@ class DashboardStatsViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class ProductionCostsViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='timeseries')
+    @cached_dashboard_response('timeseries')
+    def timeseries(self, request):
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TIMESERIES_TRUNC:
+            return Response({'error': "granularity debe ser 'day', 'week' o 'month'"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_to = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else timezone.now().date()
+            date_from = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') else date_to - timedelta(days=30)
+        except ValueError:
+            return Response({'error': 'Las fechas deben tener formato AAAA-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': "'from' debe ser anterior a 'to'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        books_per_order = (
+            Book_on_order.objects
+            .filter(idOrder=OuterRef('pk'))
+            .values('idOrder')
+            .annotate(total=Sum('quantity'))
+            .values('total')
+        )
+        rows = (
+            Order.objects
+            .filter(order_date__gte=date_from, order_date__lte=date_to)
+            .annotate(
+                period=TIMESERIES_TRUNC[granularity]('order_date'),
+                book_count=Coalesce(Subquery(books_per_order, output_field=IntegerField()), 0)
+            )
+            .values('period')
+            .annotate(
+                orders=Count('idOrder'),
+                revenue=Sum('total_price'),
+                books=Sum('book_count'),
+                outstanding=Sum('outstanding_payment')
+            )
+        )
+        buckets = {row['period']: row for row in rows}
+
+        series = []
+        current = _bucket_start(date_from, granularity)
+        while current <= date_to:
+            row = buckets.get(current, {})
+            series.append({
+                'period': current.strftime('%Y-%m-%d'),
+                'orders': row.get('orders', 0),
+                'revenue': round(row.get('revenue') or 0, 2),
+                'books': row.get('books') or 0,
+                'outstanding': round(row.get('outstanding') or 0, 2)
+            })
+            current = _next_bucket(current, granularity)
+
+        return Response({
+            'granularity': granularity,
+            'from': date_from.strftime('%Y-%m-%d'),
+            'to': date_to.strftime('%Y-%m-%d'),
+            'series': series
+        })
+
+    # Margen real de los libros pedidos con los costos vigentes en cada fecha
+    @action(detail=False, methods=['get'], url_path='margins')
+    @cached_dashboard_response('margins')
+    def margins(self, request):
+        group_by = [g for g in request.query_params.get('group_by', 'month,format,cover').split(',') if g]
+        invalid = [g for g in group_by if g not in MARGIN_GROUPS]
+        if invalid or not group_by:
+            return Response({'error': f"group_by debe contener: {', '.join(MARGIN_GROUPS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') else None
+            date_to = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else None
+        except ValueError:
+            return Response({'error': 'Las fechas deben tener formato AAAA-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return Response(margin_analysis(group_by, date_from, date_to))
+        except MarginAnalysisError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'], url_path='top_books')
+    @cached_dashboard_response('top_books')
+    def top_books(self, request):
+        group_by = request.query_params.get('group_by', 'book')
+        if group_by not in TOP_BOOKS_GROUPS:
+            return Response({'error': f"group_by debe ser uno de: {', '.join(TOP_BOOKS_GROUPS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), 100)
+        except ValueError:
+            return Response({'error': "El parámetro 'limit' debe ser un entero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        window = request.query_params.get('window', 'month')
+        today = timezone.now().date()
+        if window == 'week':
+            date_from, date_to = today - timedelta(days=today.weekday()), today
+        elif window == 'month':
+            date_from, date_to = today.replace(day=1), today
+        elif window == 'year':
+            date_from, date_to = today.replace(month=1, day=1), today
+        elif window == 'custom':
+            try:
+                date_from = date.fromisoformat(request.query_params.get('from', ''))
+                date_to = date.fromisoformat(request.query_params.get('to', ''))
+            except ValueError:
+                return Response({'error': "La ventana 'custom' requiere 'from' y 'to' con formato AAAA-MM-DD"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if date_from > date_to:
+                return Response({'error': "'from' debe ser anterior a 'to'"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            return Response({'error': "window debe ser 'week', 'month', 'year' o 'custom'"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        links = Book_on_order.objects.filter(
+            idOrder__order_date__gte=date_from,
+            idOrder__order_date__lte=date_to
+        )
+        if group_by == 'cover':
+            cover_name = (
+                Requested_book_additive.objects
+                .filter(idRequested_book=OuterRef('idRequested_book'), idAdditive__name__istartswith='carátula')
+                .order_by('-pk')
+                .values('idAdditive__name')[:1]
+            )
+            links = links.annotate(label=Coalesce(Subquery(cover_name), Value('Carátula Regular')))
+        else:
+            links = links.annotate(label=F(TOP_BOOKS_GROUPS[group_by]))
+
+        fields = ['label', 'idRequested_book__idBook'] if group_by == 'book' else ['label']
+        rows = (
+            links.values(*fields)
+            .annotate(quantity=Sum('quantity'))
+            .order_by('-quantity', 'label')[:limit]
+        )
+
+        top = []
+        for row in rows:
+            item = {'label': row['label'], 'quantity': row['quantity']}
+            if group_by == 'book':
+                item['idBook'] = row['idRequested_book__idBook']
+            top.append(item)
+
+        return Response({
+            'window': window,
+            'from': date_from.strftime('%Y-%m-%d'),
+            'to': date_to.strftime('%Y-%m-%d'),
+            'group_by': group_by,
+            'top': top
+        })
+
+class ProductionCostsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Production_costs.objects.all()
+    version_tables = (Production_costs._meta.db_table,)
     serializer_class = ProductionCostsSerializer
+    cursor_ordering_fields = ('product',)
+    filter_fields = {'idProduction_costs': ('exact', 'in')}
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
+        qs = self.filter_queryset(self.get_queryset())
         product = request.query_params.get('product')
         if product:
             qs = qs.filter(product__icontains=product)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -743,4 +1047,92 @@ class ProductionCostsViewSet(viewsets.ModelViewSet):
         qs.delete()
         return Response({'deleted': deleted})
 
-            
\ No newline at end of file
+            
+#? ----------------------------
+#? SyncViewSet
+#? ----------------------------
+class SyncViewSet(viewsets.ViewSet):
+    # GET /api/sync/?since=<ISO>&tables=orders,clients&page_size=1000
+    # Sin `since` devuelve todas las filas. Mientras `next` no sea null se
+    # repite la petición con ?cursor=<next>; luego el cliente guarda
+    # `server_time` y lo envía como `since` en la siguiente sincronización.
+    def list(self, request):
+        since = None
+        raw_since = request.query_params.get('since') or request.query_params.get('updated_since')
+        if raw_since:
+            since = parse_datetime(raw_since) or parse_datetime(raw_since.replace(' ', '+'))
+            if since is None:
+                return Response({'error': 'Fecha "since" inválida, use formato ISO 8601'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        tables = [t.strip() for t in request.query_params.get('tables', '').split(',') if t.strip()]
+        unknown = [t for t in tables if t not in SYNC_TABLES]
+        if unknown:
+            return Response({'error': f'Tablas desconocidas: {unknown}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', SYNC_PAGE_SIZE)), 1), MAX_SYNC_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': "El parámetro 'page_size' debe ser un entero"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(collect_changes(since, tables, request.query_params.get('cursor'), page_size))
+        except ValueError:
+            return Response({'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+#? ----------------------------
+#? QuoteViewSet
+#? ----------------------------
+class QuoteViewSet(viewsets.ViewSet):
+    # POST /api/quotes/ {"items": [{"idBook": 1, "additives": [2], "discount": 10, "quantity": 3}, ...]}
+    # Un ítem puede dar number_pages/color_pages/printing_format en lugar de idBook;
+    # printing_format también sirve para cotizar un libro existente en otro formato.
+    def create(self, request):
+        serializer = QuoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        items = serializer.validated_data['items']
+
+        try:
+            costs, rates = get_pricing_tables()
+            currencies = serializer.validated_data.get('currencies') or sorted(rates)
+            unknown = [c for c in currencies if c not in rates]
+            if unknown:
+                raise PricingError(f'Tasa de cambio no configurada: {unknown}')
+        except PricingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        books = Book.objects.in_bulk({item['idBook'] for item in items if item.get('idBook') is not None})
+        additives = Additive.objects.in_bulk({a for item in items for a in item['additives']})
+
+        results = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                book = books.get(item.get('idBook'))
+                if item.get('idBook') is not None and book is None:
+                    raise PricingError(f"Libro {item['idBook']} no existe.")
+                pages = item.get('number_pages', book.number_pages if book else 0)
+                color_pages = item.get('color_pages', book.color_pages if book else 0)
+                printing_format = item.get('printing_format') or (book.printing_format if book else 'normal')
+                missing = [a for a in item['additives'] if a not in additives]
+                if missing:
+                    raise PricingError(f'Aditivos no encontrados: {missing}')
+                base_price = book_base_price(pages, color_pages, printing_format, costs, rates)
+                unit_price, total = quote_book(
+                    base_price,
+                    [(additives[a].name, additives[a].price) for a in item['additives']],
+                    discount=item['discount'],
+                    quantity=item['quantity'],
+                )
+            except PricingError as e:
+                errors.append({'item': index, 'error': str(e)})
+                continue
+            results.append({
+                'item': index,
+                'base_price': base_price,
+                'unit_price': {c: round(convert(unit_price, rates, BASE_CURRENCY, c), 2) for c in currencies},
+                'total': {c: round(convert(total, rates, BASE_CURRENCY, c), 2) for c in currencies},
+            })
+
+        return Response({'currencies': currencies, 'results': results, 'errors': errors})
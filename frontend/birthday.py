@@ -4,7 +4,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap, QCursor
-from frontend.utils import http_get
+from frontend.utils import http_get_all_pages
 from frontend.urls import API_URL_CLIENTES
 from datetime import datetime, timedelta
 
@@ -95,12 +95,11 @@ class BirthdayTab(QWidget):
                 widget.deleteLater()
 
         try:
-            response = http_get(API_URL_CLIENTES)
-            if not response or response.status_code != 200:
+            clients = http_get_all_pages(API_URL_CLIENTES)
+            if clients is None:
                 self._show_no_clients_message("❌ Error al cargar clientes.")
                 return
 
-            clients = response.json()
             today = datetime.now()
 
             birthday_clients = []
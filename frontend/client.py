@@ -7,7 +7,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap, QMouseEvent
 from frontend.urls import API_URL_CLIENTES, API_URL_BOOKS, API_URL_ADITIVOS, API_URL_CLIENTES, API_URL_ORDERS
-from frontend.utils import http_get, http_post, http_patch, http_delete, make_icon_label
+from frontend.utils import http_get, http_get_all_pages, http_post, http_patch, http_delete, make_icon_label
 from frontend.price.get_rates import convert_to_currency
 from frontend.price.price import calculate_price
 
@@ -307,12 +307,11 @@ class ClientsPage(QWidget):
             self.list_cliente.clear()
             return
 
-        r = http_get(API_URL_CLIENTES)
-        if r is None or r.status_code != 200:
+        all_clients = http_get_all_pages(API_URL_CLIENTES)
+        if all_clients is None:
             QMessageBox.critical(self, "Error", "Error de red.")
             return
 
-        all_clients = r.json()
         q_lower = q.lower()
 
         data = [
@@ -439,15 +438,11 @@ class ClientsPage(QWidget):
             self.search_delete_results.clear()
             return
 
-        r = http_get(API_URL_CLIENTES)
-        if r is None:
+        all_clients = http_get_all_pages(API_URL_CLIENTES)
+        if all_clients is None:
             QMessageBox.critical(self, "Error", "Error de red.")
             return
-        if r.status_code != 200:
-            QMessageBox.warning(self, "Error", f"Error en la búsqueda: {r.status_code}")
-            return
 
-        all_clients = r.json()
         q_lower = q.lower()
         data = [
             c for c in all_clients 
@@ -870,9 +865,9 @@ class ClientsPage(QWidget):
             self.client_info_layout.addWidget(self.client_placeholder)
 
     def _load_books_and_additives(self):
-        r_books = http_get(API_URL_BOOKS)
-        if r_books and r_books.status_code == 200:
-            self.books_data = r_books.json()
+        books = http_get_all_pages(API_URL_BOOKS)
+        if books is not None:
+            self.books_data = books
         
         r_additives = http_get(API_URL_ADITIVOS)
         if r_additives and r_additives.status_code == 200:
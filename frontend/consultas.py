@@ -388,6 +388,32 @@ class ConsultasPage(QWidget):
         self.detail_layout.addWidget(card)
 
     def _calcular_precios(self, book):
+        printing_format = book.get("printing_format", "normal").lower()
+        r = http_get(f"{API_URL_BOOKS}{book.get('idBook')}/prices/", params={"printing_format": printing_format})
+        if r and r.status_code == 200:
+            variantes = r.json().get("prices", {}).get(printing_format)
+            if variantes:
+                return self._formatear_precios(variantes)
+        return self._calcular_precios_local(book)
+
+    def _formatear_precios(self, variantes):
+        def fmt(value):
+            if value is None:
+                return "—"
+            return int(value) if float(value).is_integer() else value
+
+        precios = []
+        orden = ["Normal"] + [
+            next((v for v in variantes if v.lower().startswith(tipo)), None)
+            for tipo in ("carátula dura", "carátula solapa", "carátula premium")
+        ]
+        for variante in orden:
+            if variante in variantes:
+                p = variantes[variante]
+                precios.append(f"{variante}: {fmt(p.get('USD'))} USD | {fmt(p.get('CUP'))} CUP | {fmt(p.get('MLC'))} MLC")
+        return precios
+
+    def _calcular_precios_local(self, book):
         precios = []
         number_of_pages = book.get("number_pages", 0)
         color_pages = book.get("color_pages", 0)
@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QPixmap
-from frontend.utils import http_get, http_put
+from frontend.utils import http_get, http_post
 from frontend.urls import API_URL_ORDERS
 from datetime import datetime
 
@@ -41,49 +41,20 @@ class ExcelGenerationThread(QThread):
                     
                     for book_info in order_data['books']:
                         book = book_info['book']
-                        additives = book_info['additives']
-                        
-                        tipo = "R"
-                        for additive in additives:
-                            if additive["name"].lower().startswith("servicio"):
-                                tipo = additive["name"][9].upper()
-                                break
-                        
-                        portada = "normal"
-                        tipo_caratula = "normal" 
-                        
-                        for additive in additives:
-                            additive_name = additive["name"].lower()
-                            if additive_name.startswith("carátula"):
-                                portada = additive["name"][9:]
-                                if "dura" in additive_name:
-                                    if "premium" in additive_name:
-                                        tipo_caratula = "dura_premium"
-                                    else:
-                                        tipo_caratula = "dura"
-                                elif "solapa" in additive_name:
-                                    tipo_caratula = "solapa"
-                                else:
-                                    tipo_caratula = "normal"
-                                break
-                        
-                        def get_lomo(paginas, caratula_type):
-                            if caratula_type in ["dura", "dura_premium"]:
-                                return round(paginas / 170 + 0.5, 2)
-                            else:
-                                return round(paginas / 170 + 0.1, 4)
+                        spec = book_info['production']
+                        tipo = spec['service']
+                        portada = spec['cover']
                         
                         numero_paginas = book.get('number_pages', 0)
                         color_paginas = book.get('color_pages', 0)
-                        printing_format = book.get('printing_format', 'normal')
-                        formato = 'G' if printing_format.lower().startswith('g') else 'N'
+                        formato = spec['format']
                         titulo = book.get('title', 'Desconocido')
                         if color_paginas > 0:
                             if color_paginas == numero_paginas:
                                 titulo += " (color)"
                             else:
                                 titulo += " (algunas a color)"
-                        lomo_calculado = get_lomo(numero_paginas, tipo_caratula)
+                        lomo_calculado = spec['spine_width']
                         
                         
                         row_data = {
@@ -404,9 +375,8 @@ class ExcelGenerationThread(QThread):
                     cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
         
     def _mark_orders_as_added_to_excel(self, order_ids):
-        for order_id in order_ids:
-            update_data = {"added_to_excel": True}
-            response = http_put(f"{API_URL_ORDERS}{order_id}/update_order_data/", update_data)
+        if order_ids:
+            http_post(f"{API_URL_ORDERS}mark_added_to_excel/", {"ids": list(order_ids)})
 
 
 
@@ -618,41 +588,15 @@ class ExcelTab(QWidget):
                 excel_mode = 'new'
 
         try:
-            response = http_get(API_URL_ORDERS)
+            self.progress_bar.setValue(10)
+            response = http_get(f"{API_URL_ORDERS}bulk_full_details/", params={"added_to_excel": "false"})
             
             if not response or response.status_code != 200:
                 QMessageBox.warning(self, "Error", "No se pudieron obtener las órdenes del sistema.")
                 self._reset_ui()
                 return
-            orders_list = response.json()
-            
-            if not orders_list:
-                QMessageBox.information(self, "Información", "No hay órdenes en el sistema.")
-                self._reset_ui()
-                return
-
-            orders_data = []
-            total_orders = len(orders_list)
-            
-            progress_label = QLabel("Obteniendo datos de órdenes...")
-            self.layout().addWidget(progress_label)
-            
-            for i, order in enumerate(orders_list):
-                order_id = order.get('idOrder')
-                if order_id:
-                    order_data = self._get_order_data(order_id)
-                    if order_data:
-                        orders_data.append(order_data)
-                
-                progress = int((i + 1) / total_orders * 50)
-                self.progress_bar.setValue(progress)
-            
-            progress_label.deleteLater()
-            
-            if not orders_data:
-                QMessageBox.warning(self, "Error", "No se pudieron obtener datos de ninguna orden.")
-                self._reset_ui()
-                return
+            orders_data = response.json()
+            self.progress_bar.setValue(50)
 
             new_orders = [order for order in orders_data if not order.get('added_to_excel', False)]
             
@@ -674,13 +618,6 @@ class ExcelTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error al procesar órdenes: {str(e)}")
             self._reset_ui()
 
-    def _get_order_data(self, order_id):
-        url = f"{API_URL_ORDERS}{order_id}/full_details/"
-        r = http_get(url)
-        if r and r.status_code == 200:
-            return r.json()
-        return None
-
     def _update_progress(self, value):
         adjusted_value = 50 + int(value * 0.5)
         self.progress_bar.setValue(adjusted_value)
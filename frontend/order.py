@@ -8,13 +8,14 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QIcon, QPixmap,  QStandardItemModel, QStandardItem
 from datetime import date, datetime
-from frontend.utils import http_get, http_post, http_delete, http_put, make_icon_label
+from frontend.utils import http_get, http_get_all_pages, http_post, http_delete, http_put, make_icon_label
 from frontend.urls import (
     API_URL_ORDERS, API_URL_CLIENTES, API_URL_MENSAJERIAS, API_URL_BOOKS,
     API_URL_ADITIVOS, API_URL_REQUESTED_BOOKS, API_URL_REQUESTED_BOOK_ADDITIVES,
     API_URL_BOOK_ON_ORDER
 )
-from frontend.price.get_rates import convert_to_currency
+from frontend.price.get_rates import convert_to_currency, rates_version
+from frontend.price.costs import costs_version
 from frontend.price.price import calculate_price
 from frontend.price_service import PriceService
 import json
@@ -130,6 +131,10 @@ class OrderWidget(QWidget):
         self.selected_books = []
         self.order_data = None
         self.clients_data = []
+        self.books_by_id = {}
+        self.additives_by_id = {}
+        self._book_price_memo = {}
+        self._price_error = None
 
         # Inicializar cada pestaña
         self.selected_additives = []
@@ -146,10 +151,7 @@ class OrderWidget(QWidget):
 
 #* -------------------- CARGAR DATOS DESDE BACKEND --------------------
     def _load_clients(self):
-        self.clients_data = []
-        r = http_get(API_URL_CLIENTES)
-        if r and r.status_code == 200:
-            self.clients_data = r.json()
+        self.clients_data = http_get_all_pages(API_URL_CLIENTES) or []
 
     def _load_deliveries(self):
         r = http_get(API_URL_MENSAJERIAS)
@@ -164,9 +166,11 @@ class OrderWidget(QWidget):
             self.add_delivery_completer.activated.connect(self._on_delivery_selected)
 
     def _load_books(self):
-        r = http_get(API_URL_BOOKS)
-        if r and r.status_code == 200:
-            self.books_data = r.json()
+        books = http_get_all_pages(API_URL_BOOKS)
+        if books is not None:
+            self.books_data = books
+            self.books_by_id = {b['idBook']: b for b in self.books_data}
+            self._book_price_memo = {}
 
             titles = [f"{b['title']} — {b['author']} — Formato: {b['printing_format']}" for b in self.books_data]
             model = QStandardItemModel()
@@ -202,6 +206,8 @@ class OrderWidget(QWidget):
             self.additives_data = r.json()
         else:
             self.additives_data = []
+        self.additives_by_id = {a['idAdditive']: a for a in self.additives_data}
+        self._book_price_memo = {}
         service_additives = [a for a in self.additives_data if a["name"].lower().startswith("servicio")]
         self.add_type_combo.clear()
         self.add_type_combo.addItem("Regular")
@@ -507,22 +513,39 @@ class OrderWidget(QWidget):
         tab_layout.addWidget(scroll)
 
 #* -------------------- FUNCIONES DE AÑADIR ORDEN --------------------
-    def _calculate_book_price(self, book_entry):
-        book_data = None
-        for b in self.books_data:
-            if b['idBook'] == book_entry.get('book_id'):
-                book_data = b
-                break
-        
+    def _price_versions(self):
+        # Se leen una vez por recálculo del formulario: pueden revalidar por HTTP
+        return costs_version(), rates_version()
+
+    def _calculate_book_price(self, book_entry, versions):
+        # Memoizado por libro, aditivos, descuento, cantidad y versión de costos/tasas;
+        # los catálogos se indexan por id al cargarlos. Solo se guardan los
+        # precios calculados: los fallos se reintentan en el siguiente recálculo.
+        key = (
+            book_entry.get('book_id'),
+            tuple(book_entry.get('additives', [])),
+            book_entry.get('discount', 0),
+            book_entry.get('quantity', 1),
+        ) + tuple(versions)
+        if key not in self._book_price_memo:
+            price = self._compute_book_price(book_entry)
+            if price is None:
+                return None
+            if len(self._book_price_memo) > 1024:
+                self._book_price_memo.clear()
+            self._book_price_memo[key] = price
+        return self._book_price_memo[key]
+
+    def _compute_book_price(self, book_entry):
+        book_data = self.books_by_id.get(book_entry.get('book_id'))
         if not book_data:
-            return 0
+            return None
         
-        book_additives = []
-        for add_id in book_entry.get('additives', []):
-            for additive in self.additives_data:
-                if additive['idAdditive'] == add_id:
-                    book_additives.append(additive)
-                    break
+        book_additives = [
+            self.additives_by_id[add_id]
+            for add_id in book_entry.get('additives', [])
+            if add_id in self.additives_by_id
+        ]
         caratula_price = 0
         other_additives_price = 0
         for additive in book_additives:
@@ -535,6 +558,8 @@ class OrderWidget(QWidget):
         color_pages = book_data.get("color_pages", 0)
         printing_format = book_data.get("printing_format", "normal").lower()
         book_base_price = calculate_price(number_of_pages, color_pages, printing_format)
+        if book_base_price is None:
+            return None
 
         total_price_before_discount = book_base_price + caratula_price
         discount_percentage = book_entry.get('discount', 0)
@@ -686,9 +711,29 @@ class OrderWidget(QWidget):
 
 
     def _update_totals_add(self):
+        # Si algún libro no tiene precio no se muestra un total parcial: el
+        # error queda en _price_error y bloquea la creación de la orden.
+        self._price_error = None
         total_books = 0
-        for book in self.selected_books:
-            total_books += self._calculate_book_price(book)
+        try:
+            versions = self._price_versions()
+            for book in self.selected_books:
+                price = self._calculate_book_price(book, versions)
+                if price is None:
+                    title = self.books_by_id.get(book.get('book_id'), {}).get('title', book.get('book_id'))
+                    self._price_error = f"No se pudo calcular el precio de «{title}»: faltan costos o tasas."
+                    break
+                total_books += price
+        except ConnectionError:
+            self._price_error = "No se pudieron obtener los costos o tasas del servidor."
+        except KeyError as e:
+            self._price_error = f"Falta el costo o la tasa {e}."
+        if self._price_error:
+            self.total_price_label.setText("— $")
+            self.total_price_label.setToolTip(self._price_error)
+            self.add_outstanding_payment_label.setText("— $")
+            return
+        self.total_price_label.setToolTip("")
 
         delivery = float(self.delivery_price_label.text().replace("$", "").strip())
         discount = self.add_order_discount.value()
@@ -899,6 +944,11 @@ class OrderWidget(QWidget):
             QMessageBox.warning(self, "Error", "Debe añadir al menos un libro al pedido.")
             return
 
+        self._update_totals_add()
+        if self._price_error:
+            QMessageBox.warning(self, "Error", self._price_error)
+            return
+
         client_id = None
         for c in self.clients_data:
 
@@ -1358,33 +1408,23 @@ class OrderWidget(QWidget):
                 self.modify_order_list.addItem(item)
                 return
 
-        r = http_get(API_URL_ORDERS)
+        r = http_get(f"{API_URL_ORDERS}search/", params={"q": query})
         if not r or r.status_code != 200:
             QMessageBox.warning(self, "Error", "No se pudieron obtener las órdenes del servidor.")
             return
 
         results = []
-        for order in r.json():
-            client = order.get("client_name", "").lower()
-            identity = order.get("client_identity", "").lower()
-            phone = order.get("client_phone_number", "").lower()
+        for order in r.json().get("results", []):
             date = order.get("order_date", "Sin fecha")
-
-            if (
-                query in client
-                or query in identity
-                or query in phone
-                or query in str(order["idOrder"])
-            ):
-                item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, order["idOrder"])
-                if order.get("done", False):
-                    item.setIcon(QIcon("frontend/icons/check.png"))  
-                else:
-                    item.setIcon(QIcon("frontend/icons/pendiente.png"))
-                    
-                results.append(item)
+            item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.UserRole, order["idOrder"])
+            if order.get("done", False):
+                item.setIcon(QIcon("frontend/icons/check.png"))  
+            else:
+                item.setIcon(QIcon("frontend/icons/pendiente.png"))
+                
+            results.append(item)
         if results:
             for item in results:
                 self.modify_order_list.addItem(item)
@@ -2040,32 +2080,22 @@ class OrderWidget(QWidget):
                 self.delete_order_list.addItem(item)
                 return
 
-        r = http_get(API_URL_ORDERS)
+        r = http_get(f"{API_URL_ORDERS}search/", params={"q": query})
         if not r or r.status_code != 200:
             QMessageBox.warning(self, "Error", "No se pudieron obtener las órdenes del servidor.")
             return
 
         results = []
-        for order in r.json():
-            client = order.get("client_name", "").lower()
-            identity = order.get("client_identity", "").lower()
-            phone = order.get("client_phone_number", "").lower()
+        for order in r.json().get("results", []):
             date = order.get("order_date", "Sin fecha")
-
-            if (
-                query in client
-                or query in identity
-                or query in phone
-                or query in str(order["idOrder"])
-            ):
-                item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, order["idOrder"])
-                if order.get("done", False):
-                    item.setIcon(QIcon("frontend/icons/check.png"))  
-                else:
-                    item.setIcon(QIcon("frontend/icons/pendiente.png"))
-                results.append(item)
+            item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.UserRole, order["idOrder"])
+            if order.get("done", False):
+                item.setIcon(QIcon("frontend/icons/check.png"))  
+            else:
+                item.setIcon(QIcon("frontend/icons/pendiente.png"))
+            results.append(item)
 
         if results:
             for item in results:
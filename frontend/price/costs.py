@@ -0,0 +1,40 @@
+import time
+from frontend.urls import API_URL_PRODUCTION_COSTS
+from frontend.utils import http_get
+
+# Segundos durante los que se usan los costos sin preguntar al servidor. Pasado
+# ese tiempo se revalida con If-None-Match: si la tabla no cambió el servidor
+# responde 304 y se reutiliza el mismo diccionario.
+COSTS_TTL = 30
+
+_state = {'costs': None, 'response': None, 'expires': 0.0, 'version': 0}
+
+
+def _refresh():
+    r = http_get(API_URL_PRODUCTION_COSTS)
+    if r is not None and r.status_code == 200:
+        if r is not _state['response']:
+            _state['costs'] = {item['product']: item['product_price'] for item in r.json()}
+            _state['response'] = r
+            _state['version'] += 1
+    elif _state['costs'] is None:
+        status = r.status_code if r is not None else 'sin conexión'
+        raise ConnectionError(f"No se pudieron obtener los costos de producción ({status})")
+    # Sin servidor se siguen usando los últimos costos conocidos
+    _state['expires'] = time.monotonic() + COSTS_TTL
+
+
+def get_costs():
+    if _state['costs'] is None or time.monotonic() >= _state['expires']:
+        _refresh()
+    return _state['costs']
+
+
+# Cambia cada vez que se cargan costos distintos; sirve como clave de memoización
+def costs_version():
+    get_costs()
+    return _state['version']
+
+
+def invalidate_costs():
+    _state['expires'] = 0.0
@@ -0,0 +1,85 @@
+import re
+import numpy as np
+from frontend.price.costs import get_costs
+from frontend.price.get_rates import get_rates
+
+# Códigos de formato usados en los arreglos; cualquier otro valor da NaN
+FORMAT_CODES = {'normal': 0, 'grande': 1}
+MIN_PRICE = 9
+FIXED_COSTS = {
+    'normal': ("flexibado", "repelado", "acetato", "ziplo", "otros costos", "Marcador", "Tarjeta de regalo"),
+    'grande': ("flexibado", "repelado", "acetato", "otros costos", "Marcador", "Tarjeta de regalo"),
+}
+COVER_RE = re.compile(r"^\s*(car[aá]tula.*?)\s*\((normal|grande)\)\s*$", re.IGNORECASE)
+
+
+def format_codes(formats):
+    return np.array([FORMAT_CODES.get(str(f).strip().lower(), -1) for f in formats], dtype=np.int8)
+
+
+# Precio base en USD (sin aditivos) para muchos libros a la vez. Mismo cálculo
+# que calculate_price: libros inválidos valen 0 y formatos desconocidos NaN.
+def base_prices(pages, color_pages, formats, costs=None, rates=None):
+    costs = get_costs() if costs is None else costs
+    rates = get_rates() if rates is None else rates
+
+    pages = np.asarray(pages, dtype=np.float64)
+    color = np.asarray(color_pages, dtype=np.float64)
+    codes = np.asarray(formats) if np.asarray(formats).dtype.kind in 'iu' else format_codes(formats)
+    grande = codes == FORMAT_CODES['grande']
+
+    sheets = np.where(grande, 2.0, 4.0)
+    printing = (
+        (costs["Imprimir una hoja en BN"] + costs["Precio de una hoja"]) * (pages / sheets) +
+        (costs["Imprimir una hoja en color"] + costs["Precio de una hoja"]) * (color / sheets)
+    )
+    pliego = costs["pliego A3"]
+    cover = np.where(grande | (pages > 500) | (color > 500), pliego, pliego / 2)
+    fixed = np.where(
+        grande,
+        sum(costs[name] for name in FIXED_COSTS['grande']),
+        sum(costs[name] for name in FIXED_COSTS['normal'])
+    )
+
+    cost_usd = (printing + cover + fixed) / rates["CUP"] * rates["USD"]
+    prices = np.floor(cost_usd * costs["multiplicador"] * np.where(grande, 0.8, 1.0))
+    prices = np.maximum(prices, MIN_PRICE)
+
+    prices[(codes != FORMAT_CODES['normal']) & ~grande] = np.nan
+    prices[(pages <= 0) | (color < 0) | (color > pages)] = 0
+    return prices
+
+
+# {"Carátula dura": {"normal": 5.0, "grande": 7.0}, ...} a partir de los
+# aditivos con nombres del tipo "Carátula dura (normal)".
+def cover_prices_from_additives(additives):
+    covers = {}
+    for additive in additives:
+        match = COVER_RE.match(additive.get("name", ""))
+        if match:
+            variant = match.group(1).strip().capitalize()
+            covers.setdefault(variant, {})[match.group(2).lower()] = float(additive.get("price", 0))
+    return covers
+
+
+# Lista de precios completa en una pasada: columnas (variante, moneda) con
+# "Normal" para el libro sin carátula y una por cada variante de `covers`.
+# Las variantes que no existen para el formato del libro quedan en NaN.
+def price_list(pages, color_pages, formats, covers=None, currencies=("USD", "CUP", "MLC"), costs=None, rates=None):
+    rates = get_rates() if rates is None else rates
+    codes = format_codes(formats)
+    base = base_prices(pages, color_pages, codes, costs=costs, rates=rates)
+
+    variants = {"Normal": base}
+    for variant, by_format in (covers or {}).items():
+        cover = np.full(len(codes), np.nan)
+        for fmt, price in by_format.items():
+            cover[codes == FORMAT_CODES.get(fmt, -2)] = price
+        variants[variant] = base + cover
+
+    columns = {}
+    for variant, usd in variants.items():
+        for currency in currencies:
+            converted = usd / rates["USD"] * rates[currency]
+            columns[(variant, currency)] = converted if currency == "USD" else np.round(converted, 2)
+    return columns
@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from frontend.price.costs import get_costs
+
+# Tasas expresadas en unidades de cada moneda por 1 USD.
+# Se consultan las fuentes registradas como mucho una vez cada RATES_TTL
+# segundos; la última tabla buena se guarda en disco para poder cotizar sin
+# conexión.
+BASE_CURRENCY = "USD"
+RATES_TTL = 600
+SNAPSHOT_PATH = os.getenv(
+    "RATES_SNAPSHOT_PATH",
+    os.path.join(os.path.expanduser("~"), "Documents", "Moe", "rates.json")
+)
+
+_sources = []
+_state = {'rates': None, 'expires': 0.0, 'version': 0}
+
+
+def invalidate_rates():
+    _state['expires'] = 0.0
+
+
+# Una fuente es un callable sin argumentos que devuelve {moneda: tasa}.
+# Las fuentes registradas antes tienen prioridad sobre las siguientes.
+def register_rate_source(source, first=False):
+    if first:
+        _sources.insert(0, source)
+    else:
+        _sources.append(source)
+    invalidate_rates()
+
+
+def rates_from_costs():
+    prefix = "tasa "
+    return {
+        product[len(prefix):].strip().upper(): float(price)
+        for product, price in get_costs().items()
+        if product.lower().startswith(prefix) and price
+    }
+
+
+def rates_from_env():
+    rates = {}
+    for currency in ("CUP", "MLC"):
+        value = os.getenv(f"EXCHANGE_RATE_{currency}")
+        if value:
+            rates[currency] = float(value)
+    return rates
+
+
+register_rate_source(rates_from_costs)
+register_rate_source(rates_from_env)
+
+
+def _load_snapshot():
+    try:
+        with open(SNAPSHOT_PATH, encoding="utf-8") as f:
+            return {k: float(v) for k, v in json.load(f)["rates"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_snapshot(rates):
+    try:
+        os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
+        tmp_path = f"{SNAPSHOT_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "rates": rates}, f)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+    except OSError:
+        pass
+
+
+def _refresh():
+    rates = {}
+    for source in reversed(_sources):
+        try:
+            rates.update(source() or {})
+        except Exception:
+            continue
+
+    if rates:
+        rates[BASE_CURRENCY] = 1.0
+        if rates != _state['rates']:
+            _save_snapshot(rates)
+            _state['rates'] = rates
+            _state['version'] += 1
+    elif _state['rates'] is None:
+        _state['rates'] = _load_snapshot() or {BASE_CURRENCY: 1.0}
+        _state['version'] += 1
+    _state['expires'] = time.monotonic() + RATES_TTL
+
+
+def get_rates():
+    if _state['rates'] is None or time.monotonic() >= _state['expires']:
+        _refresh()
+    return _state['rates']
+
+
+# Cambia cada vez que cambian las tasas; sirve como clave de memoización
+def rates_version():
+    get_rates()
+    return _state['version']
+
+
+def convert_to_currency(amount, from_currency, to_currency, ndigits=2):
+    if from_currency == to_currency:
+        return amount
+    rates = get_rates()
+    try:
+        value = amount / rates[from_currency] * rates[to_currency]
+    except KeyError as e:
+        raise ValueError(f"Tasa de cambio no disponible: {e.args[0]}")
+    return value if ndigits is None else round(value, ndigits)
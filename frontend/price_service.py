@@ -32,25 +32,21 @@ class PriceService:
     def calculate_order_price(selected_books, books_data, additives_data, delivery_price=0):
         total_price = 0
         books_prices = []
+        books_by_id = {book['idBook']: book for book in books_data}
+        additives_by_id = {additive['idAdditive']: additive for additive in additives_data}
         
         for book_entry in selected_books:
             book_id = book_entry.get('book_id')
-            book_data = None
-            
-            for book in books_data:
-                if book['idBook'] == book_id:
-                    book_data = book
-                    break
+            book_data = books_by_id.get(book_id)
             
             if not book_data:
                 continue
             
-            book_additives = []
-            for add_id in book_entry.get('additives', []):
-                for additive in additives_data:
-                    if additive['idAdditive'] == add_id:
-                        book_additives.append(additive)
-                        break
+            book_additives = [
+                additives_by_id[add_id]
+                for add_id in book_entry.get('additives', [])
+                if add_id in additives_by_id
+            ]
             
             book_price = PriceService.calculate_book_price(
                 book_data=book_data,
@@ -7,8 +7,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QPixmap, QIcon
 
-from frontend.utils import http_get, http_put, make_icon_label
-from frontend.urls import API_URL_ORDERS, API_URL_BOOK_ON_ORDER, API_URL_REQUESTED_BOOK_ADDITIVES
+from frontend.utils import http_get, http_patch, make_icon_label
+from frontend.urls import API_URL_ORDERS
 
 class ProductionStatusTab(QWidget):
     def __init__(self, parent=None):
@@ -17,19 +17,6 @@ class ProductionStatusTab(QWidget):
         self._apply_styles()
         self._setup_production_tab()
 
-    def _get_cover_type(self, requested_book_id):
-        try:
-            r = http_get(f"{API_URL_REQUESTED_BOOK_ADDITIVES}?idRequested_book={requested_book_id}")
-            if r and r.status_code == 200:
-                additives = r.json()
-                for additive in additives:
-                    additive_name = additive.get('additive', {}).get('name', '').lower()
-                    if 'caratula' in additive_name or 'carátula' in additive_name:
-                        return additive_name
-            return "Carátula Regular"
-        except:
-            return "Carátula Regular"
-
     def _setup_production_tab(self):
         if hasattr(self, "_production_tab_initialized") and self._production_tab_initialized:
             return
@@ -171,32 +158,22 @@ class ProductionStatusTab(QWidget):
                 self.production_order_list.addItem(item)
                 return
 
-        r = http_get(API_URL_ORDERS)
+        r = http_get(f"{API_URL_ORDERS}search/", params={"q": query})
         if not r or r.status_code != 200:
             QMessageBox.warning(self, "Error", "No se pudieron obtener las órdenes del servidor.")
             return
 
         results = []
-        for order in r.json():
-            client = order.get("client_name", "").lower()
-            identity = order.get("client_identity", "").lower()
-            phone = order.get("client_phone_number", "").lower()
+        for order in r.json().get("results", []):
             date = order.get("order_date", "Sin fecha")
-
-            if (
-                query in client
-                or query in identity
-                or query in phone
-                or query in str(order["idOrder"])
-            ):
-                item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, order["idOrder"])
-                if order.get("done", False):
-                    item.setIcon(QIcon("frontend/icons/check.png"))  
-                else:
-                    item.setIcon(QIcon("frontend/icons/pendiente.png"))
-                results.append(item)
+            item_text = f"Orden #{order['idOrder']} — {order['client_name']} ({date})"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.UserRole, order["idOrder"])
+            if order.get("done", False):
+                item.setIcon(QIcon("frontend/icons/check.png"))  
+            else:
+                item.setIcon(QIcon("frontend/icons/pendiente.png"))
+            results.append(item)
 
         if results:
             for item in results:
@@ -230,7 +207,7 @@ class ProductionStatusTab(QWidget):
                 book_id = book_info.get('idRequested_book')
                 quantity = book_info.get('quantity', 1)
                 
-                cover_type = self._get_cover_type(book_id)
+                cover_type = book_info.get('production', {}).get('cover_name') or "Carátula Regular"
                 self.current_book_states[book_id] = is_ready
                 
                 book_widget = QWidget()
@@ -308,49 +285,11 @@ class ProductionStatusTab(QWidget):
         order_id = self.current_production_order_id
 
         try:
-            r = http_get(f"{API_URL_BOOK_ON_ORDER}?idOrder={order_id}")
-            if not r or r.status_code != 200:
-                QMessageBox.warning(self, "Error", "No se pudieron obtener los libros de la orden.")
-                return
-
-            book_links = r.json()
+            books = {str(book_id): is_ready for book_id, is_ready in self.current_book_states.items()}
+            resp = http_patch(f"{API_URL_ORDERS}{order_id}/update_ready_status/", {"books": books})
 
-            update_success = True
-            for book_id, is_ready in self.current_book_states.items():
-                book_updated = False
-                
-                for book_link in book_links:
-                    if book_link.get('idRequested_book') == book_id:
-                        book_on_order_id = book_link.get('id')
-                        
-                        if not book_on_order_id:
-                            update_success = False
-                            continue
-                        
-                        update_data = book_link.copy()
-                        update_data['ready'] = is_ready
-                        
-                        update_data.pop('idRequested_book_title', None)
-                        update_data.pop('idOrder_type', None)
-                        
-                        resp = http_put(f"{API_URL_BOOK_ON_ORDER}{book_on_order_id}/", update_data)
-                        
-                        if resp and resp.status_code == 200:
-                            book_updated = True
-                        else:
-                            update_success = False
-                        break
-                
-                if not book_updated:
-                    update_success = False
-
-            all_ready = all(self.current_book_states.values())
-            
-            order_update_data = {"done": all_ready}
-            resp = http_put(f"{API_URL_ORDERS}{order_id}/update_order_data/", order_update_data)
-            
             if resp and resp.status_code == 200:
-                if update_success:
+                if not resp.json().get("not_found"):
                     QMessageBox.information(self, "Éxito", "Estados guardados correctamente.")
                 else:
                     QMessageBox.warning(self, "Advertencia", 
@@ -8,6 +8,8 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap
 from frontend.urls import API_URL_PRODUCTION_COSTS
 from frontend.utils import http_get, http_post, http_patch, http_delete, make_icon_label
+from frontend.price.costs import invalidate_costs
+from frontend.price.get_rates import invalidate_rates
 
 class ProductResultItem(QWidget):
     def __init__(self, product, parent=None):
@@ -124,6 +126,8 @@ class ProductionCostsPage(QWidget):
             return
 
         if r.status_code in (200, 201):
+            invalidate_costs()
+            invalidate_rates()
             QMessageBox.information(self, "Éxito", f"✅ Costo añadido:\n\n📦 {name}\n💰 ${price:.2f}")
             self.add_product.clear()
             self.add_product_price.setValue(0.01)
@@ -231,6 +235,8 @@ class ProductionCostsPage(QWidget):
         r = http_patch(f"{API_URL_PRODUCTION_COSTS}{self.selected_id}/", payload)
 
         if r and r.status_code in (200, 204):
+            invalidate_costs()
+            invalidate_rates()
             QMessageBox.information(self, "Actualizado", "✅ Costo de producción actualizado correctamente.")
             self._search_product()
         else:
@@ -385,6 +391,8 @@ class ProductionCostsPage(QWidget):
 
         r = http_delete(f"{API_URL_PRODUCTION_COSTS}{self.selected_delete_id}/")
         if r and r.status_code in (200, 204):
+            invalidate_costs()
+            invalidate_rates()
             QMessageBox.information(self, "Eliminado", f"✅ '{self.selected_delete_name}' fue eliminado correctamente.")
             self._search_product_to_delete()
             self.delete_info_card.setVisible(False)
@@ -1,5 +1,6 @@
 import requests
 import unicodedata
+from collections import OrderedDict
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap
@@ -9,13 +10,45 @@ def normalize_text(text):
     text = ''.join(c for c in text if not unicodedata.combining(c))
     return text.lower()
 
+_CONDITIONAL_CACHE_SIZE = 256
+_conditional_cache = OrderedDict()
+
+def _conditional_key(url, params):
+    return url, tuple(sorted((params or {}).items()))
+
 def http_get(url, params=None):
+    key = _conditional_key(url, params)
+    cached = _conditional_cache.get(key)
+    headers = {'If-None-Match': cached.headers['ETag']} if cached is not None else None
     try:
-        r = requests.get(url, params=params, timeout=5)
-        return r
+        r = requests.get(url, params=params, headers=headers, timeout=5)
     except Exception as e:
         return None
 
+    if r.status_code == 304 and cached is not None:
+        _conditional_cache.move_to_end(key)
+        return cached
+    if r.status_code == 200 and r.headers.get('ETag'):
+        _conditional_cache[key] = r
+        _conditional_cache.move_to_end(key)
+        if len(_conditional_cache) > _CONDITIONAL_CACHE_SIZE:
+            _conditional_cache.popitem(last=False)
+    return r
+
+def http_get_all_pages(url, params=None, page_size=500):
+    params = dict(params or {})
+    params['page_size'] = page_size
+    results = []
+    while url:
+        r = http_get(url, params=params)
+        if not r or r.status_code != 200:
+            return None
+        data = r.json()
+        results.extend(data.get('results', []))
+        url = data.get('next')
+        params = None
+    return results
+
 def http_post(url, data):
     try:
         r = requests.post(url, json=data, timeout=5)